@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for radarr_movie_fallback.slskd_group_candidates.
+
+Times the current matcher against the original per-file implementation on recorded slskd
+search responses, and checks that both pick the same candidates in the same order.
+
+Record responses with:
+  curl -H 'X-API-Key: ...' http://localhost:5030/api/v0/searches/<id>/responses > responses.json
+
+Usage:
+  python3 bench_slskd_group_candidates.py --title 'The Movie' --year 1999 responses.json [more.json ...]
+  python3 bench_slskd_group_candidates.py --synthetic   # no recordings at hand
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import radarr_movie_fallback as fallback  # noqa: E402
+
+
+def legacy_normalized_text(value: str) -> str:
+    value = re.sub(r'[^a-z0-9]+', ' ', value.lower())
+    return ' '.join(value.split())
+
+
+def legacy_group_candidates(movie: Dict[str, Any], policy_name: str, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """slskd_group_candidates as it was before SlskdNameMatcher, kept as the baseline."""
+    tokens = [token for token in legacy_normalized_text(movie['title']).split() if token not in {'the', 'a', 'an', 'of', 'and', 'in', 'to'}]
+    year = str(movie.get('year') or '')
+    bucket_order = {bucket: idx for idx, bucket in enumerate(fallback.POLICIES[policy_name]['release_buckets'])}
+    candidates = []
+
+    for response in responses:
+        username = response.get('username')
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for file in response.get('files', []):
+            raw_name = file.get('filename', '')
+            parts = raw_name.split('\\')
+            if not parts:
+                continue
+            dirname = '\\'.join(parts[:-1]) if len(parts) > 1 else ''
+            basename = parts[-1]
+            ext = Path(basename).suffix.lower()
+            if ext not in fallback.VIDEO_EXTENSIONS | fallback.SUBTITLE_EXTENSIONS:
+                continue
+            if any(token in legacy_normalized_text(basename) for token in fallback.JUNK_NAME_TOKENS):
+                continue
+            haystack = legacy_normalized_text(raw_name)
+            if year and year not in haystack:
+                continue
+            if not all(token in haystack for token in tokens[: min(len(tokens), 5)]):
+                continue
+            key = dirname or basename
+            bucket = fallback.bucket_from_quality_name(raw_name)
+            group = grouped.setdefault(key, {
+                'username': username,
+                'directory': dirname,
+                'files': [],
+                'video_files': [],
+                'subtitle_files': [],
+                'bucket': bucket,
+                'size': 0,
+            })
+            group['files'].append(file)
+            group['size'] += int(file.get('size', 0) or 0)
+            if ext in fallback.VIDEO_EXTENSIONS:
+                group['video_files'].append(file)
+            elif ext in fallback.SUBTITLE_EXTENSIONS:
+                group['subtitle_files'].append(file)
+            if bucket_order.get(bucket, 999) < bucket_order.get(group['bucket'], 999):
+                group['bucket'] = bucket
+        for group in grouped.values():
+            if not group['video_files']:
+                continue
+            largest_video = max(group['video_files'], key=lambda item: int(item.get('size', 0) or 0))
+            group['largest_video'] = largest_video
+            group['quality_rank'] = fallback.quality_rank_within_bucket(largest_video.get('filename', ''))
+            group['score'] = (
+                bucket_order.get(group['bucket'], 999),
+                fallback.quality_rank_within_bucket(largest_video.get('filename', '')),
+                -int(largest_video.get('size', 0) or 0),
+            )
+            candidates.append(group)
+    candidates.sort(key=lambda item: item['score'])
+    return candidates
+
+
+def synthetic_responses(title: str, year: int, responses: int = 30, files_per_response: int = 400, seed: int = 1) -> List[Dict[str, Any]]:
+    # Roughly what a title+year search returns: the film in a few qualities, other films, and junk
+    rng = random.Random(seed)
+    dotted = title.replace(' ', '.')
+    qualities = ['2160p.UHD.BluRay.Remux', '1080p.BluRay.x264', '720p.WEB-DL', 'DVDRip.XviD', '576p.BDRip', 'HDTV']
+    others = ['Another Film', 'Unrelated Movie', 'Something Else Entirely', f'{title} Documentary']
+    result = []
+    for index in range(responses):
+        files = []
+        for _ in range(files_per_response):
+            name = title if rng.random() < 0.6 else rng.choice(others)
+            film_year = year if rng.random() < 0.8 else year + rng.randint(1, 20)
+            quality = rng.choice(qualities)
+            folder = f"@@share{index}\\Movies\\{name} ({film_year}) [{quality.split('.')[0]}]"
+            stem = f"{name.replace(' ', '.')}.{film_year}.{quality}-GRP" if name != title else f'{dotted}.{film_year}.{quality}-GRP'
+            kind = rng.random()
+            if kind < 0.5:
+                filename = f'{folder}\\{stem}.mkv'
+            elif kind < 0.7:
+                filename = f'{folder}\\{stem}.srt'
+            elif kind < 0.8:
+                filename = f'{folder}\\Sample\\{stem}-sample.mkv'
+            elif kind < 0.9:
+                filename = f'{folder}\\{stem}.nfo'
+            else:
+                filename = f'{folder}\\Extras\\Featurette {rng.randint(1, 9)}.mp4'
+            files.append({'filename': filename, 'size': rng.randint(10 ** 6, 4 * 10 ** 10)})
+        result.append({'username': f'user{index}', 'files': files})
+    return result
+
+
+def load_responses(paths: List[str]) -> List[Dict[str, Any]]:
+    responses: List[Dict[str, Any]] = []
+    for path in paths:
+        data = json.loads(Path(path).read_text())
+        # A single /responses payload, or a list of them
+        if data and isinstance(data[0], list):
+            for item in data:
+                responses.extend(item)
+        else:
+            responses.extend(data)
+    return responses
+
+
+def candidate_keys(candidates: List[Dict[str, Any]]) -> List[Any]:
+    return [(item['username'], item['directory'], item['bucket'], item['score'], len(item['files'])) for item in candidates]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark slskd_group_candidates against the original implementation.')
+    parser.add_argument('responses', nargs='*', help='JSON files of recorded slskd search responses.')
+    parser.add_argument('--title', default='The Movie Title')
+    parser.add_argument('--year', type=int, default=1999)
+    parser.add_argument('--policy', choices=sorted(fallback.POLICIES), default='rare')
+    parser.add_argument('--synthetic', action='store_true', help='Generate 30 responses of 400 files instead of reading recordings.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.responses:
+        responses = load_responses(args.responses)
+    elif args.synthetic:
+        responses = synthetic_responses(args.title, args.year)
+    else:
+        parser.error('pass recorded response files or --synthetic')
+
+    movie = {'title': args.title, 'year': args.year}
+    file_count = sum(len(response.get('files', [])) for response in responses)
+    print(f'{len(responses)} responses, {file_count} files')
+
+    legacy = legacy_group_candidates(movie, args.policy, responses)
+    current = fallback.slskd_group_candidates(movie, args.policy, responses)
+    if candidate_keys(legacy) != candidate_keys(current):
+        print('ERROR: candidates differ from the original implementation', file=sys.stderr)
+        return 1
+    top = fallback.slskd_group_candidates(movie, args.policy, responses, limit=1)
+    if candidate_keys(top) != candidate_keys(legacy[:1]):
+        print('ERROR: limit=1 picked a different best candidate', file=sys.stderr)
+        return 1
+    print(f'{len(current)} candidates, identical to the original implementation')
+
+    timings = {}
+    for name, run in (
+        ('original', lambda: legacy_group_candidates(movie, args.policy, responses)),
+        ('matcher', lambda: fallback.slskd_group_candidates(movie, args.policy, responses)),
+        ('matcher limit=1', lambda: fallback.slskd_group_candidates(movie, args.policy, responses, limit=1)),
+    ):
+        best = min(timeit.repeat(run, repeat=args.repeat, number=args.number)) / args.number
+        timings[name] = best
+        print(f'{name:>16}: {best * 1000:8.2f} ms per call')
+    print(f"Speedup: {timings['original'] / timings['matcher']:.1f}x ({timings['original'] / timings['matcher limit=1']:.1f}x with limit=1)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 
 import argparse
+import concurrent.futures
 import copy
+import errno
+import hashlib
+import heapq
 import json
 import os
 import re
@@ -21,9 +25,17 @@ SLSKD_API_KEY = 'pirate-orb-slskd-api-key-2026'
 RADARR_BASE = 'http://localhost:7878/api/v3'
 SLSKD_BASE = 'http://localhost:5030/api/v0'
 SOULSEEK_COMPLETE_ROOT = Path('/Volumes/Raiju/downloads/complete/soulseek')
+# Outside the root, so saving it never touches a directory the index watches
+SOULSEEK_INDEX_PATH = SOULSEEK_COMPLETE_ROOT.parent / '.soulseek-complete-index.json'
 VIDEO_EXTENSIONS = {'.mkv', '.mp4', '.avi', '.m4v', '.mov', '.wmv', '.mpg', '.mpeg', '.iso'}
 SUBTITLE_EXTENSIONS = {'.srt', '.ass', '.ssa', '.sub', '.idx'}
+MEDIA_EXTENSIONS = VIDEO_EXTENSIONS | SUBTITLE_EXTENSIONS
 JUNK_NAME_TOKENS = {'sample', 'trailer', 'extras', 'featurette'}
+# Substring match on the normalized basename, same as checking each junk token with `in`
+JUNK_NAME_PATTERN = re.compile('|'.join(sorted(JUNK_NAME_TOKENS)))
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+TITLE_STOPWORDS = {'the', 'a', 'an', 'of', 'and', 'in', 'to'}
+COPY_CHUNK_BYTES = 16 * 1024 * 1024
 DEFAULT_TORRENT_DELAY_MINUTES = 60
 PROFILE_NAMES = {
     'normal': 'Custom - Normal',
@@ -241,7 +253,7 @@ def quality_name_from_release(release: Dict[str, Any]) -> str:
 
 
 def normalized_text(value: str) -> str:
-    value = re.sub(r'[^a-z0-9]+', ' ', value.lower())
+    value = NON_ALNUM_PATTERN.sub(' ', value.lower())
     return ' '.join(value.split())
 
 
@@ -321,39 +333,103 @@ def issue_manual_grab(release: Dict[str, Any]) -> Dict[str, Any]:
     return radarr_request('POST', '/release', body)
 
 
-def search_slskd(query: str, timeout_ms: int = 5000, response_limit: int = 30, file_limit: int = 400) -> List[Dict[str, Any]]:
-    search = slskd_request('POST', '/searches', {
-        'searchText': query,
-        'filterResponses': True,
-        'maximumPeerQueueLength': 50,
-        'minimumPeerUploadSpeed': 0,
-        'minimumResponseFileCount': 1,
-        'responseLimit': response_limit,
-        'fileLimit': file_limit,
-        'searchTimeout': timeout_ms,
-    })
-    search_id = search['id']
-    for _ in range(max(10, timeout_ms // 1000 + 10)):
-        state = slskd_request('GET', f'/searches/{search_id}?includeResponses=false')
-        if 'InProgress' not in state.get('state', ''):
-            break
-        time.sleep(1)
-    responses = slskd_request('GET', f'/searches/{search_id}/responses')
+def search_slskd_many(queries: List[str], timeout_ms: int = 5000, response_limit: int = 30, file_limit: int = 400) -> List[Dict[str, Any]]:
+    # All queries run on slskd at once, so the batch costs one search timeout instead of one per query
+    search_ids = []
     try:
-        slskd_request('DELETE', f'/searches/{search_id}')
-    except Exception:
-        pass
-    return responses
+        for query in queries:
+            search = slskd_request('POST', '/searches', {
+                'searchText': query,
+                'filterResponses': True,
+                'maximumPeerQueueLength': 50,
+                'minimumPeerUploadSpeed': 0,
+                'minimumResponseFileCount': 1,
+                'responseLimit': response_limit,
+                'fileLimit': file_limit,
+                'searchTimeout': timeout_ms,
+            })
+            search_ids.append(search['id'])
+
+        running = list(search_ids)
+        for _ in range(max(10, timeout_ms // 1000 + 10)):
+            running = [
+                search_id for search_id in running
+                if 'InProgress' in slskd_request('GET', f'/searches/{search_id}?includeResponses=false').get('state', '')
+            ]
+            if not running:
+                break
+            time.sleep(1)
+
+        response_lists = [slskd_request('GET', f'/searches/{search_id}/responses') or [] for search_id in search_ids]
+    finally:
+        # Every search that was created is removed from slskd, even if a later request failed
+        for search_id in search_ids:
+            try:
+                slskd_request('DELETE', f'/searches/{search_id}')
+            except Exception:
+                pass
+    return merge_slskd_responses(response_lists)
+
+
+def merge_slskd_responses(response_lists: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    # One response per user with files deduplicated, so each (username, directory) is grouped once
+    merged: Dict[str, Dict[str, Any]] = {}
+    seen: Dict[str, set[str]] = {}
+    for responses in response_lists:
+        for response in responses:
+            username = response.get('username')
+            if username not in merged:
+                merged[username] = dict(response, files=[])
+                seen[username] = set()
+            for file in response.get('files', []):
+                filename = file.get('filename', '')
+                if filename not in seen[username]:
+                    seen[username].add(filename)
+                    merged[username]['files'].append(file)
+    return list(merged.values())
 
 
 def title_tokens(title: str) -> List[str]:
     tokens = normalized_text(title).split()
-    return [token for token in tokens if token not in {'the', 'a', 'an', 'of', 'and', 'in', 'to'}]
-
-
-def slskd_group_candidates(movie: Dict[str, Any], policy_name: str, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    tokens = title_tokens(movie['title'])
-    year = str(movie.get('year') or '')
+    return [token for token in tokens if token not in TITLE_STOPWORDS]
+
+
+class SlskdNameMatcher:
+    # Built once per movie. Each basename is normalized once and each directory once per search,
+    # instead of normalizing the basename and the full path for every file.
+    def __init__(self, title: str, year: str) -> None:
+        self.tokens = title_tokens(title)[:5]
+        self.token_set = set(self.tokens)
+        self.year = year
+        self.directories: Dict[str, Tuple[str, set[str]]] = {}
+
+    def _directory(self, dirname: str) -> Tuple[str, set[str]]:
+        entry = self.directories.get(dirname)
+        if entry is None:
+            normalized = normalized_text(dirname)
+            entry = (normalized, set(normalized.split()))
+            self.directories[dirname] = entry
+        return entry
+
+    def matches(self, dirname: str, basename: str) -> bool:
+        base = normalized_text(basename)
+        if JUNK_NAME_PATTERN.search(base):
+            return False
+        directory, directory_words = self._directory(dirname)
+        # Same string normalized_text gives for the full backslash-joined path
+        haystack = f'{directory} {base}' if directory and base else directory or base
+        if self.year and self.year not in haystack:
+            return False
+        missing = self.token_set - directory_words
+        if not missing or missing.issubset(base.split()):
+            return True
+        # Tokens are substring matches (spider man matches spiderman), whole words are only the fast path
+        return all(token in haystack for token in self.tokens)
+
+
+def slskd_group_candidates(movie: Dict[str, Any], policy_name: str, responses: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    # With limit, only the best `limit` candidates are ordered (heap selection instead of a full sort)
+    matcher = SlskdNameMatcher(movie['title'], str(movie.get('year') or ''))
     bucket_order = {bucket: idx for idx, bucket in enumerate(POLICIES[policy_name]['release_buckets'])}
     candidates = []
 
@@ -362,37 +438,31 @@ def slskd_group_candidates(movie: Dict[str, Any], policy_name: str, responses: L
         grouped: Dict[str, Dict[str, Any]] = {}
         for file in response.get('files', []):
             raw_name = file.get('filename', '')
-            parts = raw_name.split('\\')
-            if not parts:
-                continue
-            dirname = '\\'.join(parts[:-1]) if len(parts) > 1 else ''
-            basename = parts[-1]
-            ext = Path(basename).suffix.lower()
-            if ext not in VIDEO_EXTENSIONS | SUBTITLE_EXTENSIONS:
-                continue
-            if any(token in normalized_text(basename) for token in JUNK_NAME_TOKENS):
+            dirname, _sep, basename = raw_name.rpartition('\\')
+            ext = os.path.splitext(basename)[1].lower()
+            if ext not in MEDIA_EXTENSIONS:
                 continue
-            haystack = normalized_text(raw_name)
-            if year and year not in haystack:
-                continue
-            if not all(token in haystack for token in tokens[: min(len(tokens), 5)]):
+            if not matcher.matches(dirname, basename):
                 continue
             key = dirname or basename
             bucket = bucket_from_quality_name(raw_name)
-            group = grouped.setdefault(key, {
-                'username': username,
-                'directory': dirname,
-                'files': [],
-                'video_files': [],
-                'subtitle_files': [],
-                'bucket': bucket,
-                'size': 0,
-            })
+            group = grouped.get(key)
+            if group is None:
+                group = {
+                    'username': username,
+                    'directory': dirname,
+                    'files': [],
+                    'video_files': [],
+                    'subtitle_files': [],
+                    'bucket': bucket,
+                    'size': 0,
+                }
+                grouped[key] = group
             group['files'].append(file)
             group['size'] += int(file.get('size', 0) or 0)
             if ext in VIDEO_EXTENSIONS:
                 group['video_files'].append(file)
-            elif ext in SUBTITLE_EXTENSIONS:
+            else:
                 group['subtitle_files'].append(file)
             if bucket_order.get(bucket, 999) < bucket_order.get(group['bucket'], 999):
                 group['bucket'] = bucket
@@ -404,10 +474,12 @@ def slskd_group_candidates(movie: Dict[str, Any], policy_name: str, responses: L
             group['quality_rank'] = quality_rank_within_bucket(largest_video.get('filename', ''))
             group['score'] = (
                 bucket_order.get(group['bucket'], 999),
-                quality_rank_within_bucket(largest_video.get('filename', '')),
+                group['quality_rank'],
                 -int(largest_video.get('size', 0) or 0),
             )
             candidates.append(group)
+    if limit is not None:
+        return heapq.nsmallest(limit, candidates, key=lambda item: item['score'])
     candidates.sort(key=lambda item: item['score'])
     return candidates
 
@@ -425,53 +497,227 @@ def enqueue_slskd_group(candidate: Dict[str, Any]) -> None:
     slskd_request('POST', f"/transfers/downloads/{urllib.parse.quote(candidate['username'])}", files)
 
 
+def completed_candidate_files(candidate: Dict[str, Any], downloads: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    # downloads is one user's entry from /transfers/downloads
+    wanted = {file['filename'] for file in candidate['video_files']}
+    matched = []
+    completed = []
+    for directory in downloads.get('directories', []):
+        for file in directory.get('files', []):
+            if file.get('filename') in wanted:
+                matched.append(file)
+                state = file.get('state', '')
+                if 'Completed' in state and 'Errored' not in state:
+                    completed.append(file)
+    if matched and len(completed) == len(matched):
+        return completed
+    return None
+
+
 def wait_for_slskd_completion(candidate: Dict[str, Any], timeout_seconds: int = 3600) -> List[Dict[str, Any]]:
     deadline = time.time() + timeout_seconds
-    wanted = {file['filename'] for file in candidate['video_files']}
     while time.time() < deadline:
         downloads = slskd_request('GET', f"/transfers/downloads/{urllib.parse.quote(candidate['username'])}")
-        matched = []
-        completed = []
-        for directory in downloads.get('directories', []):
-            for file in directory.get('files', []):
-                if file.get('filename') in wanted:
-                    matched.append(file)
-                    state = file.get('state', '')
-                    if 'Completed' in state and 'Errored' not in state:
-                        completed.append(file)
-        if matched and len(completed) == len(matched):
+        completed = completed_candidate_files(candidate, downloads)
+        if completed is not None:
             return completed
         time.sleep(5)
     raise TimeoutError('Timed out waiting for Soulseek download completion')
 
 
+class CompletedFileIndex:
+    # filename -> directories under root, saved to index_path and refreshed incrementally:
+    # only directories whose mtime changed since the last refresh are listed again
+    def __init__(self, root: Path, index_path: Optional[Path] = None) -> None:
+        self.root = root
+        self.index_path = index_path
+        self.dirs: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, set[str]] = {}
+        if index_path is not None and index_path.exists():
+            try:
+                saved = json.loads(index_path.read_text())
+                if saved.get('root') == str(root):
+                    self.dirs = saved['dirs']
+            except (OSError, ValueError, KeyError):
+                self.dirs = {}
+        for path, entry in self.dirs.items():
+            for name in entry['files']:
+                self.by_name.setdefault(name, set()).add(path)
+
+    def _forget(self, path: str) -> None:
+        for name in self.dirs.pop(path)['files']:
+            paths = self.by_name.get(name, set())
+            paths.discard(path)
+            if not paths:
+                self.by_name.pop(name, None)
+
+    def _scan(self, path: str, mtime: float) -> None:
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+        if path in self.dirs:
+            self._forget(path)
+        self.dirs[path] = {'mtime': mtime, 'files': files, 'subdirs': subdirs}
+        for name in files:
+            self.by_name.setdefault(name, set()).add(path)
+
+    def refresh(self) -> None:
+        # The saved index is only rewritten when a directory was listed again or dropped
+        changed = False
+        seen = set()
+        stack = [str(self.root)]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime
+                if path not in self.dirs or self.dirs[path]['mtime'] != mtime:
+                    self._scan(path, mtime)
+                    changed = True
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            seen.add(path)
+            stack.extend(os.path.join(path, name) for name in self.dirs[path]['subdirs'])
+        for path in set(self.dirs) - seen:
+            self._forget(path)
+            changed = True
+        if changed and self.index_path is not None:
+            try:
+                tmp_path = self.index_path.with_suffix('.tmp')
+                tmp_path.write_text(json.dumps({'root': str(self.root), 'dirs': self.dirs}))
+                tmp_path.replace(self.index_path)
+            except OSError as exc:
+                print(f'WARNING: could not save Soulseek file index to {self.index_path}: {exc}', file=sys.stderr)
+
+    def find(self, name: str) -> List[Path]:
+        # Call refresh() first, once per lookup rather than once per name
+        return [Path(path) / name for path in self.by_name.get(name, ())]
+
+
+_completed_index: Optional[CompletedFileIndex] = None
+
+
+def completed_file_index() -> CompletedFileIndex:
+    global _completed_index
+    if _completed_index is None:
+        _completed_index = CompletedFileIndex(SOULSEEK_COMPLETE_ROOT, SOULSEEK_INDEX_PATH)
+    return _completed_index
+
+
 def locate_completed_file(candidate: Dict[str, Any]) -> Path:
-    target_names = {Path(file['filename']).name for file in candidate['video_files']}
-    newest_matches = []
-    for name in target_names:
-        for path in SOULSEEK_COMPLETE_ROOT.rglob(name):
-            if path.is_file():
-                newest_matches.append(path)
+    # Soulseek paths use backslashes, Path would treat the whole remote path as one name
+    target_names = {file['filename'].split('\\')[-1] for file in candidate['video_files']}
+
+    # slskd saves a transfer into a folder named after the last component of its remote directory
+    reported_dir = SOULSEEK_COMPLETE_ROOT / candidate['directory'].split('\\')[-1] if candidate['directory'] else SOULSEEK_COMPLETE_ROOT
+    newest_matches = [reported_dir / name for name in target_names if (reported_dir / name).is_file()]
+
+    if not newest_matches:
+        index = completed_file_index()
+        index.refresh()
+        for name in target_names:
+            newest_matches.extend(path for path in index.find(name) if path.is_file())
     if not newest_matches:
         raise FileNotFoundError(f'Could not locate downloaded Soulseek file under {SOULSEEK_COMPLETE_ROOT}')
     newest_matches.sort(key=lambda path: path.stat().st_mtime, reverse=True)
     return newest_matches[0]
 
 
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(COPY_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file_resumable(source: Path, destination: Path) -> None:
+    # Copies into <destination>.partial, picking up where an interrupted copy stopped, and only
+    # renames it into place once its checksum matches the source
+    partial = destination.with_name(destination.name + '.partial')
+    total = source.stat().st_size
+    offset = partial.stat().st_size if partial.exists() else 0
+    if offset > total:
+        partial.unlink()
+        offset = 0
+
+    source_digest = hashlib.sha256()
+    if offset:
+        print(f'Resuming copy of {source.name} at {offset / total:.0%}')
+        # The source prefix goes into the digest, the end-to-end check below catches a bad partial
+        with open(source, 'rb') as handle:
+            remaining = offset
+            while remaining > 0:
+                chunk = handle.read(min(COPY_CHUNK_BYTES, remaining))
+                source_digest.update(chunk)
+                remaining -= len(chunk)
+
+    copied = offset
+    next_report = 0.0
+    with open(source, 'rb') as src, open(partial, 'ab') as dst:
+        src.seek(offset)
+        while True:
+            chunk = src.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            dst.write(chunk)
+            source_digest.update(chunk)
+            copied += len(chunk)
+            if total and copied / total >= next_report:
+                print(f'Copying {source.name}: {copied / total:.0%} ({copied // (1024 * 1024)} / {total // (1024 * 1024)} MiB)')
+                next_report = copied / total + 0.1
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    if file_checksum(partial) != source_digest.hexdigest():
+        partial.unlink()
+        raise RuntimeError(f'Checksum mismatch copying {source} to {destination}; source left in place')
+    shutil.copystat(source, partial)
+    partial.replace(destination)
+
+
+def transfer_file(source: Path, destination: Path) -> str:
+    # Same volume: rename, or hardlink then unlink. Otherwise a verified, resumable copy.
+    if source.stat().st_dev == destination.parent.stat().st_dev:
+        try:
+            os.rename(source, destination)
+            return 'rename'
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                try:
+                    os.link(source, destination)
+                    source.unlink()
+                    return 'hardlink'
+                except OSError:
+                    pass
+    copy_file_resumable(source, destination)
+    source.unlink()
+    return 'copy'
+
+
+def refresh_movies(movie_ids: List[int]) -> None:
+    # RefreshMovie also rescans the movie folders, so one command covers what RescanMovie did
+    radarr_request('POST', '/command', {'name': 'RefreshMovie', 'movieIds': movie_ids})
+
+
 def import_file_to_movie(movie: Dict[str, Any], source_file: Path) -> Path:
     movie_dir = Path(movie['path'].replace('/movies-leviathan', '/Volumes/Leviathan/Movies'))
     movie_dir.mkdir(parents=True, exist_ok=True)
     destination = movie_dir / f"{movie['title']} ({movie['year']}){source_file.suffix.lower()}"
     if destination.exists():
         destination = movie_dir / source_file.name
-    shutil.move(str(source_file), str(destination))
-    radarr_request('POST', '/command', {'name': 'RefreshMovie', 'movieIds': [movie['id']]})
-    radarr_request('POST', '/command', {'name': 'RescanMovie', 'movieIds': [movie['id']]})
+    method = transfer_file(source_file, destination)
+    print(f'Moved {source_file.name} to {movie_dir} ({method})')
+    refresh_movies([movie['id']])
     return destination
 
 
-def run_fallback(movie_id: int, policy_name: Optional[str], dry_run: bool, soulseek_timeout: int) -> int:
-    profiles = radarr_request('GET', '/qualityprofile')
+def find_fallback(movie_id: int, policy_name: Optional[str], dry_run: bool, profiles: List[Dict[str, Any]]) -> Tuple[int, Dict[str, Any], Optional[Dict[str, Any]]]:
+    # Returns (exit code, movie, candidate); candidate is only set once a Soulseek download was enqueued
     movie = get_movie(movie_id)
     chosen_policy = policy_name or infer_policy_name(movie, profiles)
     print(f"Movie: {movie['title']} ({movie['year']}) | policy={chosen_policy}")
@@ -480,33 +726,30 @@ def run_fallback(movie_id: int, policy_name: Optional[str], dry_run: bool, souls
     best_release = choose_release(releases, chosen_policy)
     if best_release:
         quality_name = quality_name_from_release(best_release)
-        print(f"Selected Radarr release: [{best_release['protocol']}] {quality_name} :: {best_release['title']}")
+        print(f"Selected Radarr release for {movie['title']}: [{best_release['protocol']}] {quality_name} :: {best_release['title']}")
         if not dry_run:
             response = issue_manual_grab(best_release)
             print(json.dumps(response, indent=2))
-        return 0
+        return 0, movie, None
 
-    print('No acceptable Radarr release found; falling back to Soulseek search...')
+    print(f"No acceptable Radarr release found for {movie['title']}; falling back to Soulseek search...")
     queries = [
         f"{movie['title']} {movie['year']}",
         f"{movie['title'].replace(':', ' ')} {movie['year']} 1080p",
         f"{movie['title'].replace(':', ' ')} {movie['year']} 720p",
     ]
-    slsk_candidates: List[Dict[str, Any]] = []
     for query in queries:
         print(f'Soulseek query: {query}')
-        responses = search_slskd(query)
-        slsk_candidates = slskd_group_candidates(movie, chosen_policy, responses)
-        if slsk_candidates:
-            break
+    responses = search_slskd_many(queries)
+    slsk_candidates = slskd_group_candidates(movie, chosen_policy, responses, limit=1)
 
     if not slsk_candidates:
-        print('No qualifying Soulseek candidates found.')
-        return 1
+        print(f"No qualifying Soulseek candidates found for {movie['title']}.")
+        return 1, movie, None
 
     candidate = slsk_candidates[0]
     print(
-        'Selected Soulseek candidate:',
+        f"Selected Soulseek candidate for {movie['title']}:",
         json.dumps({
             'username': candidate['username'],
             'directory': candidate['directory'],
@@ -516,17 +759,94 @@ def run_fallback(movie_id: int, policy_name: Optional[str], dry_run: bool, souls
         }, indent=2)
     )
     if dry_run:
-        return 0
+        return 0, movie, None
 
     enqueue_slskd_group(candidate)
-    print('Enqueued Soulseek download; waiting for completion...')
-    wait_for_slskd_completion(candidate, timeout_seconds=soulseek_timeout)
+    return 0, movie, candidate
+
+
+def import_completed_candidate(movie: Dict[str, Any], candidate: Dict[str, Any]) -> Path:
     downloaded = locate_completed_file(candidate)
     destination = import_file_to_movie(movie, downloaded)
-    print(f'Imported Soulseek file to {destination}')
+    print(f"Imported Soulseek file for {movie['title']} to {destination}")
+    return destination
+
+
+def run_fallback(movie_id: int, policy_name: Optional[str], dry_run: bool, soulseek_timeout: int) -> int:
+    profiles = radarr_request('GET', '/qualityprofile')
+    code, movie, candidate = find_fallback(movie_id, policy_name, dry_run, profiles)
+    if candidate is None:
+        return code
+
+    print('Enqueued Soulseek download; waiting for completion...')
+    wait_for_slskd_completion(candidate, timeout_seconds=soulseek_timeout)
+    import_completed_candidate(movie, candidate)
     return 0
 
 
+def poll_pending_downloads(pending: Dict[int, Tuple[Dict[str, Any], Dict[str, Any], float]], results: Dict[int, int]) -> None:
+    # One /transfers/downloads call covers every movie still downloading; finished ones are imported right away.
+    # Deadlines are checked even when slskd is unreachable, so the batch still ends.
+    try:
+        downloads = {user['username']: user for user in slskd_request('GET', '/transfers/downloads') or []}
+    except Exception as exc:
+        print(f'ERROR: could not poll Soulseek downloads: {exc}', file=sys.stderr)
+        downloads = None
+    for movie_id, (movie, candidate, deadline) in list(pending.items()):
+        completed = None
+        if downloads is not None:
+            completed = completed_candidate_files(candidate, downloads.get(candidate['username'], {}))
+        if completed is not None:
+            del pending[movie_id]
+            try:
+                import_completed_candidate(movie, candidate)
+                results[movie_id] = 0
+            except Exception as exc:
+                print(f"ERROR: import failed for {movie['title']}: {exc}", file=sys.stderr)
+                results[movie_id] = 1
+        elif time.time() >= deadline:
+            del pending[movie_id]
+            print(f"ERROR: timed out waiting for Soulseek download of {movie['title']}", file=sys.stderr)
+            results[movie_id] = 1
+
+
+def run_fallback_batch(movie_ids: List[int], policy_name: Optional[str], dry_run: bool, soulseek_timeout: int, workers: int) -> int:
+    profiles = radarr_request('GET', '/qualityprofile')
+    results: Dict[int, int] = {}
+    pending: Dict[int, Tuple[Dict[str, Any], Dict[str, Any], float]] = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(find_fallback, movie_id, policy_name, dry_run, profiles): movie_id for movie_id in movie_ids}
+        while futures or pending:
+            for future in [future for future in futures if future.done()]:
+                movie_id = futures.pop(future)
+                try:
+                    code, movie, candidate = future.result()
+                except Exception as exc:
+                    print(f'ERROR: movie {movie_id}: {exc}', file=sys.stderr)
+                    results[movie_id] = 1
+                    continue
+                if candidate is None:
+                    results[movie_id] = code
+                else:
+                    print(f"Enqueued Soulseek download for {movie['title']}; {len(pending) + 1} download(s) pending")
+                    pending[movie_id] = (movie, candidate, time.time() + soulseek_timeout)
+
+            if pending:
+                poll_pending_downloads(pending, results)
+
+            if futures:
+                concurrent.futures.wait(futures, timeout=5, return_when=concurrent.futures.FIRST_COMPLETED)
+            elif pending:
+                time.sleep(5)
+
+    failed = sorted(movie_id for movie_id, code in results.items() if code != 0)
+    print(f'Batch finished: {len(results) - len(failed)} of {len(results)} movies succeeded')
+    if failed:
+        print(f"Failed movie IDs: {','.join(str(movie_id) for movie_id in failed)}")
+    return 1 if failed else 0
+
+
 def parse_movie_ids(value: str) -> List[int]:
     return [int(part.strip()) for part in value.split(',') if part.strip()]
 
@@ -543,10 +863,13 @@ def main() -> int:
     set_parser.add_argument('--profile', choices=['normal', 'cinematic', 'rare'], required=True)
 
     fallback_parser = subparsers.add_parser('run-fallback', help='Run the explicit waterfall search for a movie.')
-    fallback_parser.add_argument('--movie-id', type=int, required=True)
+    fallback_target = fallback_parser.add_mutually_exclusive_group(required=True)
+    fallback_target.add_argument('--movie-id', type=int)
+    fallback_target.add_argument('--movie-ids', help='Comma-separated Radarr movie IDs to run concurrently as one batch.')
     fallback_parser.add_argument('--policy', choices=['normal', 'cinematic', 'rare'])
     fallback_parser.add_argument('--dry-run', action='store_true')
     fallback_parser.add_argument('--soulseek-timeout', type=int, default=3600)
+    fallback_parser.add_argument('--workers', type=int, default=4, help='Movies searched at once in batch mode.')
 
     args = parser.parse_args()
 
@@ -568,6 +891,8 @@ def main() -> int:
         return 0
 
     if args.command == 'run-fallback':
+        if args.movie_ids:
+            return run_fallback_batch(parse_movie_ids(args.movie_ids), args.policy, args.dry_run, args.soulseek_timeout, args.workers)
         return run_fallback(args.movie_id, args.policy, args.dry_run, args.soulseek_timeout)
 
     raise RuntimeError('Unhandled command')
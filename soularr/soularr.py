@@ -10,10 +10,16 @@ import shutil
 import difflib
 import operator
 import traceback
+import threading
+import concurrent.futures
 import configparser
 import logging
 import json
-from datetime import datetime
+import random
+import sqlite3
+import contextlib
+import http.server
+from datetime import datetime, timedelta
 import copy
 import music_tag
 import slskd_api
@@ -30,7 +36,526 @@ class EnvInterpolation(configparser.ExtendedInterpolation):
         value = super().before_read(parser, section, option, value)
         return os.path.expandvars(value)
 
+
+class DirectoryCache:
+    """
+    Directory listings browsed from Soulseek peers, keyed by (username, directory).
+    Stored in SQLite so album and track searches, and later runs, reuse the same listings
+    instead of browsing the peer again. Entries older than ttl seconds are ignored and the
+    least recently used entries are evicted as soon as there are more than max_entries.
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        #Upper bound on the row count, recounted by prune(), so put() doesn't need a COUNT(*)
+        self.entries = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS directory_cache (
+                    username TEXT NOT NULL,
+                    directory TEXT NOT NULL,
+                    listing TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (username, directory)
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS directory_cache_last_used ON directory_cache (last_used)")
+        self.prune()
+
+    def get(self, username, directory):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT listing, fetched_at FROM directory_cache WHERE username = ? AND directory = ?",
+                (username, directory)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                with self.conn:
+                    self.conn.execute("DELETE FROM directory_cache WHERE username = ? AND directory = ?", (username, directory))
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE directory_cache SET last_used = ? WHERE username = ? AND directory = ?", (now, username, directory))
+        return json.loads(row[0])
+
+    def put(self, username, directory, listing):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO directory_cache (username, directory, listing, fetched_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (username, directory, json.dumps(listing), now, now))
+            self.entries += 1
+        if self.entries > self.max_entries:
+            self.prune()
+
+    def prune(self):
+        with self.lock, self.conn:
+            expired = self.conn.execute("DELETE FROM directory_cache WHERE fetched_at < ?", (time.time() - self.ttl,)).rowcount
+            evicted = self.conn.execute(
+                "DELETE FROM directory_cache WHERE rowid IN (SELECT rowid FROM directory_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)).rowcount
+            self.entries = self.conn.execute("SELECT COUNT(*) FROM directory_cache").fetchone()[0]
+        if expired or evicted:
+            logger.debug(f"Directory cache pruned {expired} expired and {evicted} least recently used entries")
+
+    def close(self):
+        self.prune()
+        with self.lock:
+            self.conn.close()
+
+
+class CachedLidarr:
+    """
+    Wraps LidarrAPI and memoizes album and track lookups for the length of a run, so the same
+    album is not fetched again by choose_release, album_match and post-processing.
+    With a ttl above 0 lookups are also kept in SQLite at store_path and reused by later runs.
+    Everything other than get_album/get_tracks is passed straight through to the client.
+    """
+
+    def __init__(self, client, store_path=None, ttl=0):
+        self.client = client
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.hits = {}
+        self.misses = {}
+        self.conn = None
+        if store_path and ttl > 0:
+            self.conn = sqlite3.connect(store_path, check_same_thread=False, timeout=30)
+            with self.conn:
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS lidarr_metadata (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )""")
+                self.conn.execute("DELETE FROM lidarr_metadata WHERE fetched_at < ?", (time.time() - ttl,))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _cached(self, method, key, fetch):
+        key = json.dumps([method, key])
+        with self.lock:
+            if key in self.memory:
+                self.hits[method] = self.hits.get(method, 0) + 1
+                return copy.deepcopy(self.memory[key])
+            if self.conn is not None:
+                row = self.conn.execute("SELECT value FROM lidarr_metadata WHERE key = ? AND fetched_at >= ?",
+                                        (key, time.time() - self.ttl)).fetchone()
+                if row is not None:
+                    self.hits[method] = self.hits.get(method, 0) + 1
+                    self.memory[key] = json.loads(row[0])
+                    return copy.deepcopy(self.memory[key])
+            self.misses[method] = self.misses.get(method, 0) + 1
+
+        value = fetch()
+
+        with self.lock:
+            self.memory[key] = value
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute("INSERT OR REPLACE INTO lidarr_metadata (key, value, fetched_at) VALUES (?, ?, ?)",
+                                      (key, json.dumps(value), time.time()))
+        return copy.deepcopy(value)
+
+    def get_album(self, albumIds=None, **kwargs):
+        if kwargs or not isinstance(albumIds, int):
+            return self.client.get_album(albumIds, **kwargs)
+        return self._cached('get_album', albumIds, lambda: self.client.get_album(albumIds))
+
+    def get_tracks(self, **kwargs):
+        return self._cached('get_tracks', sorted(kwargs.items()), lambda: self.client.get_tracks(**kwargs))
+
+    def upd_album(self, album):
+        key = json.dumps(['get_album', album['id']])
+        with self.lock:
+            self.memory.pop(key, None)
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM lidarr_metadata WHERE key = ?", (key,))
+        return self.client.upd_album(album)
+
+    def monitor_albums(self, album_ids, monitored):
+        """Sets monitored on many albums with one PUT /album/monitor, pyarr has no wrapper for it."""
+        with self.lock:
+            for album_id in album_ids:
+                key = json.dumps(['get_album', album_id])
+                self.memory.pop(key, None)
+                if self.conn is not None:
+                    with self.conn:
+                        self.conn.execute("DELETE FROM lidarr_metadata WHERE key = ?", (key,))
+        return self.client._put("album/monitor", self.client.ver_uri, data={"albumIds": album_ids, "monitored": monitored})
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+
+    def summary(self):
+        methods = sorted(set(self.hits) | set(self.misses))
+        return ", ".join(f"{method}: {self.hits.get(method, 0)} hits / {self.misses.get(method, 0)} misses" for method in methods)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class PeerReputation:
+    """
+    Download history per Soulseek peer (successes, failures, stalls, average throughput, last seen),
+    kept in SQLite so later runs can rank reliable peers first and skip ones that keep failing.
+    The table is small, so it is loaded into memory and written through on every update.
+    Failures and stalls fade with a half-life of failure_half_life seconds since the peer was last seen,
+    so a peer that was skipped for a bad streak is tried again later and can earn back its score.
+    """
+
+    def __init__(self, path, failure_half_life=604800):
+        self.failure_half_life = failure_half_life
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS peer_reputation (
+                    username TEXT PRIMARY KEY,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    stalls INTEGER NOT NULL DEFAULT 0,
+                    avg_throughput REAL NOT NULL DEFAULT 0,
+                    last_seen REAL NOT NULL
+                )""")
+        self.peers = {}
+        for row in self.conn.execute("SELECT username, successes, failures, stalls, avg_throughput, last_seen FROM peer_reputation"):
+            self.peers[row[0]] = dict(zip(("successes", "failures", "stalls", "avg_throughput", "last_seen"), row[1:]))
+
+    def reliability(self, username):
+        """
+        Share of successful downloads, smoothed so unknown peers start at 0.5.
+        A stall counts as half a failure, since it is often just a peer with a long upload queue.
+        """
+        peer = self.peers.get(username)
+        if peer is None:
+            return 0.5
+        penalty = peer["failures"] + 0.5 * peer["stalls"]
+        if self.failure_half_life > 0:
+            penalty *= 0.5 ** (max(0, time.time() - peer["last_seen"]) / self.failure_half_life)
+        return (peer["successes"] + 1) / (peer["successes"] + penalty + 2)
+
+    def record(self, username, outcome, bytes_transferred=0, seconds=0):
+        """outcome is one of "successes", "failures" or "stalls"."""
+        with self.lock:
+            peer = self.peers.setdefault(username, {"successes": 0, "failures": 0, "stalls": 0, "avg_throughput": 0.0, "last_seen": 0})
+            if outcome == "successes" and seconds > 0:
+                peer["avg_throughput"] = (peer["avg_throughput"] * peer["successes"] + bytes_transferred / seconds) / (peer["successes"] + 1)
+            peer[outcome] += 1
+            peer["last_seen"] = time.time()
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO peer_reputation (username, successes, failures, stalls, avg_throughput, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                    (username, peer["successes"], peer["failures"], peer["stalls"], peer["avg_throughput"], peer["last_seen"]))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class StateStore:
+    """
+    Soularr's run-to-run state in one SQLite database in --var-dir: the paging cursor, search
+    backoff, failed albums, search history, grabs and the wanted list snapshot.
+    Replaces .current_page.txt, search_denylist.json and failure_list.txt, which are imported
+    once and renamed to *.migrated. One connection is shared by all threads behind a lock,
+    and the database runs in WAL mode so the caches that share the file can read alongside it.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS search_backoff (
+                    album_id INTEGER PRIMARY KEY,
+                    failures INTEGER NOT NULL,
+                    last_attempt TEXT NOT NULL,
+                    next_eligible REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS failures (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    failed_at TEXT NOT NULL,
+                    artist_name TEXT NOT NULL,
+                    album_title TEXT NOT NULL,
+                    album_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS failures_album_id ON failures (album_id);
+                CREATE TABLE IF NOT EXISTS search_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    searched_at REAL NOT NULL,
+                    album_id INTEGER NOT NULL,
+                    query TEXT NOT NULL,
+                    result_count INTEGER NOT NULL,
+                    matched INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS search_history_album_id ON search_history (album_id);
+                CREATE TABLE IF NOT EXISTS grabs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    grabbed_at REAL NOT NULL,
+                    album_id INTEGER NOT NULL,
+                    username TEXT NOT NULL,
+                    directory TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS grabs_album_id ON grabs (album_id);
+                CREATE TABLE IF NOT EXISTS wanted_snapshot (
+                    source TEXT PRIMARY KEY,
+                    fetched_at REAL NOT NULL,
+                    total_records INTEGER NOT NULL,
+                    first_page_ids TEXT NOT NULL,
+                    records TEXT NOT NULL
+                );
+            """)
+
+    def migrate_legacy_files(self, current_page_path, denylist_path, failure_path):
+        migrated = []
+
+        with self.lock, self.conn:
+            if os.path.exists(current_page_path):
+                with open(current_page_path, 'r') as file:
+                    page_string = file.read().strip()
+                if page_string:
+                    self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('current_page', ?)", (page_string,))
+                migrated.append(current_page_path)
+
+            if os.path.exists(denylist_path):
+                try:
+                    with open(denylist_path, 'r') as file:
+                        denylist = json.load(file)
+                except (json.JSONDecodeError, IOError) as ex:
+                    logger.warning(f"Error loading search denylist for migration: {ex}. Skipping it.")
+                    denylist = {}
+                for album_key, entry in denylist.items():
+                    #Entries written before the backoff scheduler only have a failure count and a last attempt
+                    next_eligible = entry.get('next_eligible')
+                    if next_eligible is None:
+                        try:
+                            last_attempt = datetime.strptime(entry['last_attempt'], "%Y-%m-%dT%H:%M:%S").timestamp()
+                        except (KeyError, ValueError):
+                            last_attempt = time.time()
+                        next_eligible = last_attempt + search_backoff_delay(entry['failures'], jitter=False)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO search_backoff (album_id, failures, last_attempt, next_eligible) VALUES (?, ?, ?, ?)",
+                        (int(album_key), entry['failures'], entry.get('last_attempt', ''), next_eligible))
+                migrated.append(denylist_path)
+
+            if os.path.exists(failure_path):
+                with open(failure_path, 'r') as file:
+                    for line in file:
+                        #"dd/mm/YYYY HH:MM:SS - artist, album title, album id"
+                        try:
+                            failed_at, rest = line.rstrip("\n").split(" - ", 1)
+                            rest, album_id = rest.rsplit(", ", 1)
+                            artist_name, album_title = rest.split(", ", 1)
+                            album_id = int(album_id)
+                        except ValueError:
+                            logger.warning(f"Skipping unreadable failure_list.txt line: {line.strip()}")
+                            continue
+                        self.conn.execute(
+                            "INSERT INTO failures (failed_at, artist_name, album_title, album_id) VALUES (?, ?, ?, ?)",
+                            (failed_at, artist_name, album_title, album_id))
+                migrated.append(failure_path)
+
+        for path in migrated:
+            os.replace(path, path + ".migrated")
+            logger.info(f"Migrated {path} into the state database")
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_backoff(self, album_id):
+        with self.lock:
+            row = self.conn.execute("SELECT failures, last_attempt, next_eligible FROM search_backoff WHERE album_id = ?", (album_id,)).fetchone()
+        return dict(zip(("failures", "last_attempt", "next_eligible"), row)) if row else None
+
+    def set_backoff(self, album_id, failures, last_attempt, next_eligible):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_backoff (album_id, failures, last_attempt, next_eligible) VALUES (?, ?, ?, ?)",
+                (album_id, failures, last_attempt, next_eligible))
+
+    def clear_backoff(self, album_id):
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM search_backoff WHERE album_id = ?", (album_id,)).rowcount > 0
+
+    def record_failures(self, failures):
+        """failures is a list of (failed_at, artist_name, album_title, album_id), written in one transaction."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO failures (failed_at, artist_name, album_title, album_id) VALUES (?, ?, ?, ?)",
+                failures)
+
+    def record_search(self, album_id, query, result_count, matched):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO search_history (searched_at, album_id, query, result_count, matched) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), album_id, query, result_count, int(matched)))
+
+    def record_grab(self, album_id, username, directory):
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "INSERT INTO grabs (grabbed_at, album_id, username, directory, status) VALUES (?, ?, ?, ?, 'queued')",
+                (time.time(), album_id, username, directory)).lastrowid
+
+    def finish_grab(self, grab_id, status):
+        if grab_id is None:
+            return
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE grabs SET status = ?, finished_at = ? WHERE id = ?", (status, time.time(), grab_id))
+
+    def get_wanted_snapshot(self, source):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, total_records, first_page_ids, records FROM wanted_snapshot WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'fetched_at': row[0],
+            'total_records': row[1],
+            'first_page_ids': json.loads(row[2]),
+            'records': json.loads(row[3]),
+        }
+
+    def set_wanted_snapshot(self, source, total_records, first_page_ids, records):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO wanted_snapshot (source, fetched_at, total_records, first_page_ids, records) VALUES (?, ?, ?, ?, ?)",
+                (source, time.time(), total_records, json.dumps(first_page_ids), json.dumps(records)))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class StageTimings:
+    """
+    Counts and latency histograms for the hot stages of a run (searches, browses, album_match,
+    download waits, tagging, Lidarr imports). stage() works as a context manager or a decorator
+    and is safe to use from the search, browse and download threads.
+    """
+
+    BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': [0] * (len(self.BUCKETS) + 1)}
+                self.stages[name] = stats
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+                    break
+            else:
+                stats['buckets'][-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self.stages.items()}
+
+    def report(self):
+        stages = self.snapshot()
+        if len(stages) == 0:
+            return
+        logger.info("Stage timings:")
+        for name, stats in sorted(stages.items(), key=lambda item: item[1]['total'], reverse=True):
+            logger.info(f"  {name}: count {stats['count']} total {stats['total']:.2f}s "
+                        f"avg {stats['total'] / stats['count']:.3f}s max {stats['max']:.3f}s")
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP soularr_stage_seconds Time spent in each Soularr stage.",
+            "# TYPE soularr_stage_seconds histogram",
+        ]
+        for name, stats in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS + ('+Inf',), stats['buckets']):
+                cumulative += count
+                lines.append(f'soularr_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'soularr_stage_seconds_sum{{stage="{name}"}} {stats["total"]}')
+            lines.append(f'soularr_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        return json.dumps({
+            'buckets': list(self.BUCKETS),
+            'stages': self.snapshot(),
+            'written_at': datetime.now().isoformat(timespec='seconds'),
+        }, indent=2)
+
+    def write(self, directory, output_format):
+        """Writes the timings as soularr_metrics.prom or soularr_metrics.json, replacing the old file atomically."""
+        if output_format == 'prometheus':
+            path, body = os.path.join(directory, "soularr_metrics.prom"), self.to_prometheus()
+        elif output_format == 'json':
+            path, body = os.path.join(directory, "soularr_metrics.json"), self.to_json()
+        else:
+            return
+        with open(path + ".tmp", "w") as file:
+            file.write(body)
+        os.replace(path + ".tmp", path)
+
+
 logger = logging.getLogger('soularr')
+#Guards grab_list and ignored_users when albums are searched concurrently
+state_lock = threading.Lock()
+#slskd version/API shape, filled in once by get_slskd_capabilities()
+slskd_capabilities = None
+capabilities_lock = threading.Lock()
+state_store = None
+directory_cache = None
+peer_reputation = None
+lidarr = None
+#Cumulative for the process, so a daemon reports totals across cycles
+stage_timings = StageTimings()
+#[Metrics] format, stays 'none' until the config is read
+metrics_format = 'none'
+#Per-cycle albums, artist folders and download folders still downloading, see grab_most_wanted
+in_flight = {}
+daemon_status = {
+    'cycles_running': 0,
+    'cycles_completed': 0,
+    'last_cycle_started': None,
+    'last_cycle_finished': None,
+    'last_cycle_result': None,
+    'next_cycle': None,
+}
 #Allows backwards compatibility for users updating an older version of Soularr
 #without using the new [Logging] section in the config.ini file.
 DEFAULT_LOGGING_CONF = {
@@ -39,21 +564,45 @@ DEFAULT_LOGGING_CONF = {
     'datefmt': '%Y-%m-%dT%H:%M:%S%z',
 }
 
+@stage_timings.stage('album_match')
 def album_match(lidarr_tracks, slskd_tracks, username, filetype):
-    counted = []
-    total_match = 0.0
+    if username in ignored_users:
+        return False
 
     lidarr_album = lidarr.get_album(lidarr_tracks[0]['albumId'])
     lidarr_album_name = lidarr_album['title']
     lidarr_artist_name = lidarr_album['artist']['artistName']
 
-    for lidarr_track in lidarr_tracks:
-        lidarr_filename = lidarr_track['title'] + "." + filetype.split(" ")[0]
-        best_match = 0.0
+    lidarr_filenames = [lidarr_track['title'] + "." + filetype.split(" ")[0] for lidarr_track in lidarr_tracks]
+    slskd_filenames = [slskd_track['filename'] for slskd_track in slskd_tracks]
+
+    if match_backend == 'difflib':
+        scores = difflib_track_scores(lidarr_filenames, lidarr_album_name, slskd_filenames)
+    else:
+        scores = indexed_track_scores(lidarr_filenames, lidarr_album_name, slskd_filenames)
 
-        for slskd_track in slskd_tracks:
-            slskd_filename = slskd_track['filename']
+    if scores is None:
+        return False
 
+    logger.debug(f"Per-track match ratios for {username}: {dict(zip(lidarr_filenames, scores))}")
+    logger.info(f"Found match from user: {username} for {len(scores)} tracks! Track attributes: {filetype}")
+    logger.info(f"Average sequence match ratio: {sum(scores)/len(scores)}")
+    logger.info("SUCCESSFUL MATCH")
+    logger.info("-------------------")
+    return True
+
+
+def difflib_track_scores(lidarr_filenames, lidarr_album_name, slskd_filenames):
+    """
+    Original matcher. Scores every Lidarr track against every Slskd file with check_ratio.
+    Returns the best ratio per track, or None if any track is below minimum_match_ratio.
+    """
+    scores = []
+
+    for lidarr_filename in lidarr_filenames:
+        best_match = 0.0
+
+        for slskd_filename in slskd_filenames:
             #Try to match the ratio with the exact filenames
             ratio = difflib.SequenceMatcher(None, lidarr_filename, slskd_filename).ratio()
 
@@ -70,18 +619,74 @@ def album_match(lidarr_tracks, slskd_tracks, username, filetype):
             if ratio > best_match:
                 best_match = ratio
 
-        if best_match > minimum_match_ratio:
-            counted.append(lidarr_filename)
-            total_match += best_match
+        if best_match <= minimum_match_ratio:
+            return None
+        scores.append(best_match)
 
-    if len(counted) == len(lidarr_tracks) and username not in ignored_users:
-        logger.info(f"Found match from user: {username} for {len(counted)} tracks! Track attributes: {filetype}")
-        logger.info(f"Average sequence match ratio: {total_match/len(counted)}")
-        logger.info("SUCCESSFUL MATCH")
-        logger.info("-------------------")
-        return True
+    return scores
 
-    return False
+
+def indexed_track_scores(lidarr_filenames, lidarr_album_name, slskd_filenames):
+    """
+    Same decision as difflib_track_scores, but every Slskd filename variant (full, and truncated
+    on " " / "_" to the Lidarr word count) is built once per directory and keeps its own
+    SequenceMatcher, so difflib only indexes each variant once instead of once per track.
+    quick_ratio() is used as an upper bound to skip ratio() calls that cannot reach the minimum,
+    and matching stops at the first track that has no acceptable file.
+    """
+    variant_cache = {}
+    matcher_cache = {}
+
+    def slskd_variant(slskd_filename, separator, word_count):
+        key = (slskd_filename, separator, word_count)
+        if key not in variant_cache:
+            if separator == "":
+                variant_cache[key] = slskd_filename
+            else:
+                variant_cache[key] = " ".join(slskd_filename.split(separator)[-word_count:])
+        return variant_cache[key]
+
+    def variant_ratio(lidarr_filename, variant):
+        matcher = matcher_cache.get(variant)
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(None, "", variant)
+            matcher_cache[variant] = matcher
+        matcher.set_seq1(lidarr_filename)
+        #quick_ratio() is an upper bound on ratio(), anything under the minimum fails check_ratio anyway
+        if matcher.quick_ratio() < minimum_match_ratio:
+            return None
+        ratio = matcher.ratio()
+        return ratio if ratio >= minimum_match_ratio else None
+
+    scores = []
+
+    for lidarr_filename in lidarr_filenames:
+        album_filename = lidarr_album_name + " " + lidarr_filename
+        #Same order as the check_ratio chain. The first variant that reaches the minimum wins.
+        targets = [
+            (lidarr_filename, ""),
+            (lidarr_filename, " "),
+            (lidarr_filename, "_"),
+            (album_filename, ""),
+            (album_filename, " "),
+            (album_filename, "_"),
+        ]
+        targets = [(target, separator, len(target.split())) for target, separator in targets]
+        best_match = 0.0
+
+        for slskd_filename in slskd_filenames:
+            for target, separator, word_count in targets:
+                ratio = variant_ratio(target, slskd_variant(slskd_filename, separator, word_count))
+                if ratio is not None:
+                    if ratio > best_match:
+                        best_match = ratio
+                    break
+
+        if best_match <= minimum_match_ratio:
+            return None
+        scores.append(best_match)
+
+    return scores
 
 
 def check_ratio(separator, ratio, lidarr_filename, slskd_filename):
@@ -99,7 +704,7 @@ def check_ratio(separator, ratio, lidarr_filename, slskd_filename):
 
 def album_track_num(directory):
     files = directory['files']
-    allowed_filetypes_no_attributes = [item.split(" ")[0] for item in allowed_filetypes]
+    allowed_filetypes_no_attributes = allowed_extensions
     count = 0
     index = -1
     filetype = ""
@@ -208,51 +813,93 @@ def choose_release(album_id, artist_name):
     return default_release
 
 
-def verify_filetype(file,allowed_filetype):
-    current_filetype = file['filename'].split(".")[-1]
-    bitdepth = None
-    samplerate = None
-    bitrate = None
-
-    if 'bitRate' in file:
-        bitrate = file['bitRate']
-    if 'sampleRate' in file:
-        samplerate = file['sampleRate']
-    if 'bitDepth' in file:
-        bitdepth = file['bitDepth']
-
-    #Check if the types match up for the current files type and the current type from the config
-    if current_filetype == allowed_filetype.split(" ")[0]:
-        #Check if the current type from the config specifies other attributes than the filetype (bitrate etc)
-        if " " in allowed_filetype:
-            selected_attributes = allowed_filetype.split(" ")[1]
-            #If it is a bitdepth/samplerate pair instead of a simple bitrate
-            if "/" in selected_attributes:
-                selected_bitdepth = selected_attributes.split("/")[0]
-                try:
-                    selected_samplerate = str(int(float(selected_attributes.split("/")[1]) * 1000))
-                except (ValueError, IndexError):
-                    logger.warning("Invalid samplerate in selected_attributes")
-                    return False
-
-                if bitdepth and samplerate:
-                    if str(bitdepth) == str(selected_bitdepth)and str(samplerate) == str(selected_samplerate):
-                        return True
-                else:
-                    return False
-            #If it is a bitrate
-            else:
-                selected_bitrate = selected_attributes
-                if bitrate:
-                    if str(bitrate) == str(selected_bitrate):
-                        return True
-                else:
-                    return False
-        #If no bitrate or other info then it is a match so return true
-        else:
-            return True
-    else:
-        return False
+def compile_filetype_spec(allowed_filetype):
+    """
+    Parses an allowed_filetypes entry ("flac", "mp3 320", "flac 24/96") once and returns a
+    predicate(file, extension) that accepts the same Slskd files the old per-file check did.
+    """
+    allowed_extension = allowed_filetype.split(" ")[0]
+
+    #If no bitrate or other info then any file with the extension is a match
+    if " " not in allowed_filetype:
+        return lambda file, extension: extension == allowed_extension
+
+    selected_attributes = allowed_filetype.split(" ")[1]
+
+    #If it is a bitdepth/samplerate pair instead of a simple bitrate
+    if "/" in selected_attributes:
+        selected_bitdepth = selected_attributes.split("/")[0]
+        try:
+            selected_samplerate = str(int(float(selected_attributes.split("/")[1]) * 1000))
+        except (ValueError, IndexError):
+            logger.warning(f"Invalid samplerate in allowed filetype: {allowed_filetype}")
+            return lambda file, extension: False
+
+        return lambda file, extension: (extension == allowed_extension
+                                        and bool(file.get('bitDepth')) and bool(file.get('sampleRate'))
+                                        and str(file['bitDepth']) == selected_bitdepth
+                                        and str(file['sampleRate']) == selected_samplerate)
+
+    #If it is a bitrate
+    return lambda file, extension: (extension == allowed_extension
+                                    and bool(file.get('bitRate'))
+                                    and str(file['bitRate']) == selected_attributes)
+
+
+def index_search_results(search_results):
+    """
+    Groups the files of every search response by (username, directory) in one pass.
+    Each folder records which allowed filetypes it has files for, the distinct audio files seen
+    (any allowed extension, the same rule album_track_num uses) and their bitrate/bitdepth/samplerate.
+    Search responses only list matching files, so the audio file count is a lower bound on what
+    a directory browse would return.
+    """
+    dir_index = {}
+
+    for result in search_results:
+        username = result['username']
+
+        for file in result['files']:
+            file_dir = file['filename'].rsplit('\\',1)[0] #split dir/filenames on \
+            extension = file['filename'].split(".")[-1]
+            key = (username, file_dir)
+
+            folder = dir_index.get(key)
+            if folder is None:
+                folder = {
+                    "filetypes": set(),
+                    "audio_files": set(),
+                    "extensions": set(),
+                    "bitrates": set(),
+                    "bitdepths": set(),
+                    "samplerates": set(),
+                    "upload_speed": result.get('uploadSpeed', 0),
+                    "queue_length": result.get('queueLength', 0),
+                    "free_upload_slots": result.get('freeUploadSlots', 0),
+                }
+                dir_index[key] = folder
+
+            for allowed_filetype, predicate in filetype_predicates:
+                if predicate(file, extension):
+                    folder["filetypes"].add(allowed_filetype)
+
+            if extension in allowed_extensions:
+                folder["audio_files"].add(file['filename'])
+                folder["extensions"].add(extension)
+                for attribute, stat in (("bitRate", "bitrates"), ("bitDepth", "bitdepths"), ("sampleRate", "samplerates")):
+                    if file.get(attribute):
+                        folder[stat].add(file[attribute])
+
+    return dir_index
+
+
+def folder_can_match(folder, track_num):
+    """
+    False when a directory browse could not pass album_track_num: more audio files than wanted
+    tracks were already seen, or more than one allowed extension is mixed in the folder.
+    """
+    return len(folder["audio_files"]) <= track_num and len(folder["extensions"]) <= 1
+
 
 def download_filter(allowed_filetype,directory):
     """
@@ -288,7 +935,116 @@ def download_filter(allowed_filetype,directory):
     return directory #If we didn't find unwanted files or we aren't filtering just return the original list
 
 
-def search_and_download(grab_list, query, tracks, track, artist_name, release):
+@stage_timings.stage('browse')
+def fetch_directory(username, file_dir):
+    #slskd_browse has a request timeout of browse_timeout, so a hung peer frees its browse thread
+    if get_slskd_capabilities()['directory_returns_list']:
+        return slskd_browse.users.directory(username = username, directory = file_dir)[0]
+    return slskd_browse.users.directory(username = username, directory = file_dir)
+
+
+def browse_directories(candidates):
+    """
+    Yields (username, file_dir, directory) for each candidate folder.
+    Folders in directory_cache are yielded straight away. Uncached folders are browsed on a thread pool
+    (browse_workers at a time) and yielded in the order they arrive, so one slow peer does not
+    hold up the rest. Browses that take longer than browse_timeout seconds, counted from when a
+    browse thread picks them up, are given up on. A given up browse keeps its thread until the
+    request times out, so it still counts against browse_workers.
+    """
+    pending = {}
+    abandoned = set()
+    queue = []
+
+    def timed_fetch(username, file_dir, started):
+        #The timeout clock starts here, so time spent queued behind other browses is not counted
+        started.append(time.monotonic())
+        return fetch_directory(username, file_dir)
+
+    for username, file_dir in candidates:
+        directory = directory_cache.get(username, file_dir)
+        if directory is not None:
+            logger.info(f"User: {username} Folder: {file_dir} in cache. Using cached value")
+            yield username, file_dir, directory
+        else:
+            queue.append((username, file_dir))
+
+    if len(queue) == 0:
+        return
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=browse_workers, thread_name_prefix='browse')
+    try:
+        while queue or pending:
+            abandoned = {future for future in abandoned if not future.done()}
+            while queue and len(pending) + len(abandoned) < browse_workers:
+                username, file_dir = queue.pop(0)
+                logger.info(f"User: {username} Folder: {file_dir} not in cache. Fetching from SLSKD")
+                started = []
+                future = pool.submit(timed_fetch, username, file_dir, started)
+                pending[future] = (username, file_dir, started)
+
+            done, _ = concurrent.futures.wait(list(pending) + list(abandoned), timeout=1, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                if future not in pending:
+                    continue
+                username, file_dir, _started = pending.pop(future)
+                try:
+                    directory = future.result()
+                except Exception:
+                    logger.info(f"Error getting directory from user: \"{username}\"\n{traceback.format_exc()}")
+                    continue
+
+                directory_cache.put(username, file_dir, directory)
+                yield username, file_dir, directory
+
+            now = time.monotonic()
+            for future, (username, file_dir, started) in list(pending.items()):
+                if started and now - started[0] > browse_timeout:
+                    logger.info(f"Timed out after {browse_timeout}s getting directory from user: \"{username}\" Folder: {file_dir}")
+                    del pending[future]
+                    abandoned.add(future)
+    finally:
+        #Don't wait on peers that are still browsing. Their results are no longer needed.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def rank_candidates(candidates, dir_index, track_num, album_title):
+    """
+    Orders (username, file_dir) candidates so the most promising folders are browsed first.
+    Uses only what the search response already tells us: how many of the wanted tracks were seen,
+    how close the folder name is to the album title, a free upload slot, upload speed relative to
+    the fastest candidate and queue length, plus how reliable the peer has been in earlier downloads.
+    """
+    fastest = max((dir_index[candidate]["upload_speed"] or 0 for candidate in candidates), default=0)
+    album_title = album_title.lower()
+
+    def score(candidate):
+        folder = dir_index[candidate]
+        folder_name = candidate[1].split("\\")[-1].lower()
+
+        track_score = min(len(folder["audio_files"]) / track_num, 1.0) if track_num else 0.0
+        title_score = difflib.SequenceMatcher(None, album_title, folder_name).ratio()
+        slot_score = 1.0 if folder["free_upload_slots"] else 0.0
+        speed_score = (folder["upload_speed"] or 0) / fastest if fastest else 0.0
+        queue_score = 1.0 / (1 + (folder["queue_length"] or 0))
+
+        reputation_score = peer_reputation.reliability(candidate[0])
+
+        return (0.30 * track_score + 0.20 * title_score + 0.10 * slot_score + 0.10 * speed_score
+                + 0.10 * queue_score + 0.20 * reputation_score)
+
+    scores = {candidate: score(candidate) for candidate in candidates}
+    ranked = sorted(candidates, key=lambda candidate: scores[candidate], reverse=True)
+
+    for candidate in ranked[:5]:
+        logger.debug(f"Candidate score {scores[candidate]:.3f}: User: {candidate[0]} Folder: {candidate[1]}")
+
+    return ranked
+
+
+@stage_timings.stage('search_request')
+def start_search(query):
     # PATCH(spencer 2026-07): slskd intermittently 409s on POST /searches.
     # Upstream lets that HTTPError bubble up and abort the whole cycle, so one
     # flaky response starves everything later in the wanted list. Retry with
@@ -307,115 +1063,211 @@ def search_and_download(grab_list, query, tracks, track, artist_name, release):
             time.sleep(10 * (_attempt + 1))
     if search is None:
         logger.warning(f"Giving up on query '{query}' after 3 attempts; skipping.")
-        return False
+    return search
 
-    track_num = len(tracks)
-    #Add timeout here to increase reliability with Slskd. Sometimes it doesn't update search status fast enough. More of an issue with lots of historical searches in slskd
-    time.sleep(5)
 
-    while True:
-        if slskd.searches.state(search['id'],False)['state'] != 'InProgress':   #Added False here as we don't want the search results here. Just the state.
-            break
-        time.sleep(1)
-
-    search_results = slskd.searches.search_responses(search['id']) #We use this API call twice. Let's just cache it locally. 
-    logger.info(f"Search returned {len(search_results)} results")
+def match_search_results(grab_list, search_results, filetypes, tried, tracks, track, artist_name, release):
+    """
+    Browses and matches the candidate folders in search_results for each of filetypes, skipping
+    (username, folder, filetype) combinations already in tried. Enqueues the first match.
+    Returns True once something was enqueued.
+    """
+    track_num = len(tracks)
 
-    #Init directory cache. The wide search returns all the data we need. This prevents us from hammering the users on the Soulseek network 
-    dir_cache = {}
-    folder_cache ={}
+    #Index the results. The wide search returns all the data we need. This prevents us from hammering the users on the Soulseek network 
+    dir_index = index_search_results(search_results)
+    logger.info(f"Indexed {len(dir_index)} folders from {len(search_results)} results")
 
-    for result in search_results: #Switching to cached version. One less API call
-        username = result['username']
-        if username not in dir_cache:
-            #If we don't currently have a cache for a user set one up
-            dir_cache[username] = {}
-        logger.info(f"Caching and truncating results for user: {username}")
-        init_files = result['files'] #init_files short for initial files. Before truncating
-        #Search the returned files and only cache files that are of the allowed_filetypes
-        for file in init_files:
-            file_dir = file['filename'].rsplit('\\',1)[0] #split dir/filenames on \
-            for allowed_filetype in allowed_filetypes:
-                if verify_filetype(file,allowed_filetype):  #Check the filename for an allowed type
-                    if allowed_filetype not in dir_cache[username]:
-                        dir_cache[username][allowed_filetype] = [] #Init the cache for this allowed filetype
-                    if file_dir not in dir_cache[username][allowed_filetype]:
-                        dir_cache[username][allowed_filetype].append(file_dir)
-
-    for allowed_filetype in allowed_filetypes:
+    for allowed_filetype in filetypes:
         logger.info(f"Searching for matches with selected attributes: {allowed_filetype}")
 
-        for username in dir_cache:
-            if allowed_filetype not in dir_cache[username]:
+        candidates = []
+        skipped = 0
+        for (username, file_dir), folder in dir_index.items():
+            if allowed_filetype not in folder["filetypes"] or (username, file_dir, allowed_filetype) in tried:
                 continue
-            logger.info(f"Parsing result from user: {username}")
-
-            for file_dir in dir_cache[username][allowed_filetype]:
-                
-                if username not in folder_cache:
-                    folder_cache[username] = {}
-                if file_dir not in folder_cache[username]:
-                    logger.info(f"User: {username} Folder: {file_dir} not in cache. Fetching from SLSKD")
-
-                    version = slskd.application.version()
-                    version_check = slskd_version_check(version)
+            if not folder_can_match(folder, track_num):
+                skipped += 1
+                continue
+            if peer_reputation.reliability(username) < min_peer_reliability:
+                logger.debug(f"Skipping unreliable peer: {username} Folder: {file_dir}")
+                skipped += 1
+                continue
+            candidates.append((username, file_dir))
+
+        if skipped > 0:
+            logger.info(f"Skipped {skipped} folders that cannot hold {track_num} tracks or belong to unreliable peers")
+
+        if rank_search_candidates:
+            candidates = rank_candidates(candidates, dir_index, track_num, lidarr.get_album(tracks[0]['albumId'])['title'])
+
+        if max_browse_candidates > 0:
+            browsed = sum(1 for entry in tried if entry[2] == allowed_filetype)
+            if len(candidates) > max_browse_candidates - browsed:
+                logger.info(f"Browsing the top {max(max_browse_candidates - browsed, 0)} of {len(candidates)} candidate folders")
+                candidates = candidates[:max(max_browse_candidates - browsed, 0)]
+
+        for username, file_dir in candidates:
+            tried.add((username, file_dir, allowed_filetype))
+
+        for username, file_dir, directory in browse_directories(candidates):
+            tracks_info = album_track_num(directory)
+
+            if tracks_info['count'] == track_num and tracks_info['filetype'] != "":
+                if album_match(tracks, directory['files'], username, allowed_filetype):
+                    directory = download_filter(allowed_filetype,directory) #Filter files if requested
+                    for i in range(0,len(directory['files'])):
+                        directory['files'][i]['filename'] = file_dir + "\\" + directory['files'][i]['filename']
+
+                    folder_data = {
+                        "artist_name": artist_name,
+                        "release": release,
+                        "dir": file_dir.split("\\")[-1],
+                        "discnumber": track['mediumNumber'],
+                        "username": username,
+                        "directory": directory,
+                        "enqueued_at": time.time(),
+                        #Set once the enqueue succeeds. A failed enqueue slskd still reports has no grabs row.
+                        "grab_id": None,
+                    }
+                    with state_lock:
+                        grab_list.append(folder_data)
 
-                    if not version_check:
-                        logger.info(f"Error checking slskd version number: {version}. Version check > 0.22.2: {version_check}. This would most likely be fixed by updating your slskd.")
-                       
                     try:
-                        if version_check:
-                            directory = slskd.users.directory(username = username, directory = file_dir)[0]
-                        else:
-                            directory = slskd.users.directory(username = username, directory = file_dir)
+                        slskd.transfers.enqueue(username = username, files = directory['files'])
                     except Exception:
-                        logger.info(f"Error getting directory from user: \"{username}\"\n{traceback.format_exc()}")
+                        logger.warning(f"Error enqueueing tracks! Adding {username} to ignored users list.")
+                        peer_reputation.record(username, "failures")
+                        downloads = slskd.transfers.get_downloads(username)
+
+                        for cancel_directory in downloads["directories"]:
+                            if cancel_directory["directory"] == directory["name"]:
+                                cancel_and_delete(file_dir.split("\\")[-1], username, cancel_directory["files"])
+                                with state_lock:
+                                    grab_list.remove(folder_data)
+                                    ignored_users.append(username)
                         continue
 
-                    folder_cache[username][file_dir] =copy.deepcopy(directory)
-                else: 
-                    logger.info(f"User: {username} Folder: {file_dir} in cache. Using cached value")
-                    directory = copy.deepcopy(folder_cache[username][file_dir])
-
-                tracks_info = album_track_num(directory)
-
-                if tracks_info['count'] == track_num and tracks_info['filetype'] != "":
-                    if album_match(tracks, directory['files'], username, allowed_filetype):
-                        directory = download_filter(allowed_filetype,directory) #Filter files if requested
-                        for i in range(0,len(directory['files'])):
-                            directory['files'][i]['filename'] = file_dir + "\\" + directory['files'][i]['filename']
-
-                        folder_data = {
-                            "artist_name": artist_name,
-                            "release": release,
-                            "dir": file_dir.split("\\")[-1],
-                            "discnumber": track['mediumNumber'],
-                            "username": username,
-                            "directory": directory,
-                        }
-                        grab_list.append(folder_data)
+                    register_in_flight(grab_list, folder_data)
+                    folder_data['grab_id'] = state_store.record_grab(tracks[0]['albumId'], username, file_dir)
+                    return True
+
+    return False
+
+
+def merge_search_responses(response_lists):
+    """
+    Merges the responses of several searches into one pool with a single response per user.
+    Files are deduplicated by filename, so a folder that answered several track queries is
+    indexed once with every file that any of the queries turned up.
+    """
+    merged = {}
+
+    for responses in response_lists:
+        for response in responses:
+            entry = merged.get(response['username'])
+            if entry is None:
+                entry = dict(response, files=[])
+                entry['seen'] = set()
+                merged[response['username']] = entry
+
+            for file in response['files']:
+                if file['filename'] not in entry['seen']:
+                    entry['seen'].add(file['filename'])
+                    entry['files'].append(file)
+
+    for entry in merged.values():
+        del entry['seen']
+
+    return list(merged.values())
+
+
+@stage_timings.stage('search')
+def search_and_download(grab_list, queries, tracks, track, artist_name, release):
+    """
+    Runs a batch of slskd searches (one album query, or every track query of a medium) and
+    enqueues the first folder that matches tracks. The searches run side by side on slskd,
+    are polled together and their responses merged into one candidate pool before matching.
+    With stream_search_results the responses are matched while the searches are still running:
+    only the most preferred filetype is tried until every search completes, so an early match never
+    wins over a better filetype, and the searches are stopped as soon as something is enqueued.
+    """
+    searches = []
+    for query in queries:
+        search = start_search(query)
+        if search is not None:
+            searches.append((query, search))
+
+    if len(searches) == 0:
+        return False
+
+    tried = set()
+    success = False
+
+    def fetch_responses():
+        return [slskd.searches.search_responses(search['id']) for _query, search in searches]
 
+    if stream_search_results:
+        time.sleep(1)
+        response_lists = [[] for _search in searches]
+        fetched_counts = [-1 for _search in searches]
+        search_results = []
+
+        while True:
+            finished = True
+            changed = False
+            for i, (_query, search) in enumerate(searches):
+                state = slskd.searches.state(search['id'],False)   #Added False here as we don't want the search results here. Just the state.
+                finished = finished and 'Completed' in state['state']
+                #Only download a search's responses when slskd reports new ones
+                response_count = state.get('responseCount')
+                if response_count is None or response_count > fetched_counts[i]:
+                    responses = slskd.searches.search_responses(search['id'])
+                    changed = changed or len(responses) != len(response_lists[i])
+                    response_lists[i] = responses
+                    fetched_counts[i] = len(responses) if response_count is None else response_count
+
+            if changed:
+                search_results = merge_search_responses(response_lists)
+            filetypes = allowed_filetypes if finished else allowed_filetypes[:1]
+
+            #Only re-match when new responses arrived, or once more with every filetype when the searches are done
+            if (finished or changed) and len(search_results) > 0 and match_search_results(grab_list, search_results, filetypes, tried, tracks, track, artist_name, release):
+                success = True
+                if not finished:
+                    logger.info(f"Match found while still searching. Stopping search for: {', '.join(query for query, _search in searches)}")
+                    for _query, search in searches:
                         try:
-                            slskd.transfers.enqueue(username = username, files = directory['files'])
-                            # Delete the search from SLSKD DB
-                            if delete_searches:
-                                slskd.searches.delete(search['id'])
-                            return True
+                            slskd.searches.stop(search['id'])
                         except Exception:
-                            logger.warning(f"Error enqueueing tracks! Adding {username} to ignored users list.")
-                            downloads = slskd.transfers.get_downloads(username)
+                            logger.debug(f"Error stopping search {search['id']}\n{traceback.format_exc()}")
+                break
 
-                            for cancel_directory in downloads["directories"]:
-                                if cancel_directory["directory"] == directory["name"]:
-                                    cancel_and_delete(file_dir.split("\\")[-1], username, cancel_directory["files"])
-                                    grab_list.remove(folder_data)
-                                    ignored_users.append(username)
-                            continue
+            if finished:
+                break
+            time.sleep(1)
+    else:
+        #Add timeout here to increase reliability with Slskd. Sometimes it doesn't update search status fast enough. More of an issue with lots of historical searches in slskd
+        time.sleep(5)
 
-    # Delete the search from SLSKD DB
-    if delete_searches:
-        slskd.searches.delete(search['id'])
-    return False
+        for _query, search in searches:
+            while True:
+                if slskd.searches.state(search['id'],False)['state'] != 'InProgress':   #Added False here as we don't want the search results here. Just the state.
+                    break
+                time.sleep(1)
+
+        response_lists = fetch_responses() #We use this API call twice. Let's just cache it locally. 
+        search_results = merge_search_responses(response_lists)
+        success = match_search_results(grab_list, search_results, allowed_filetypes, tried, tracks, track, artist_name, release)
+
+    logger.info(f"{len(searches)} search(es) returned {len(search_results)} results")
+    for (query, search), responses in zip(searches, response_lists):
+        state_store.record_search(tracks[0]['albumId'], query, len(responses), success)
+
+        # Delete the search from SLSKD DB
+        if delete_searches:
+            slskd.searches.delete(search['id'])
+    return success
 
 
 def is_blacklisted(title: str) -> bool:
@@ -427,229 +1279,305 @@ def is_blacklisted(title: str) -> bool:
     return False
 
 
-def grab_most_wanted(albums):
-    grab_list = []
-    failed_searches = 0
+def grab_album(album, grab_list, failed_albums):
+    """
+    Searches for and enqueues a single wanted album.
+    Returns True on a match, False on a failure and None if the album was skipped.
+    With remove_wanted_on_failure, failed albums are added to failed_albums and unmonitored
+    later in one batch by apply_failed_albums.
+    Safe to run from several worker threads at once, shared state is guarded by state_lock
+    and the state_store.
+    """
     success = False
-    search_denylist = {}
+    artist_name = album['artist']['artistName']
+    artist_id = album['artistId']
+    album_id = album['id']
 
-    if enable_search_denylist:
-        search_denylist = load_search_denylist(denylist_file_path)
+    release = choose_release(album_id, artist_name)
 
-    for album in albums:
-        artist_name = album['artist']['artistName']
-        artist_id = album['artistId']
-        album_id = album['id']
+    release_id = release['id']
+    all_tracks = lidarr.get_tracks(artistId = artist_id, albumId = album_id, albumReleaseId = release_id)
 
-        if enable_search_denylist and is_search_denylisted(search_denylist, album_id, max_search_failures):
-            logger.info(f"Skipping denylisted album: {artist_name} - {album['title']} (ID: {album_id})")
-            continue
+    #TODO: Right now if search_for_tracks is False. Multi disc albums will never be downloaded so we need to loop through media in releases even for albums
+    if len(release['media']) == 1:
+        album_title = lidarr.get_album(album_id)['title']
+        if is_blacklisted(album_title):
+            return None
 
-        release = choose_release(album_id, artist_name)
+        if len(album_title) == 1:
+            query = artist_name + " " + album_title
+        else:
+            query = artist_name + " " + album_title if config.getboolean('Search Settings', 'album_prepend_artist', fallback=False) else album_title
 
-        release_id = release['id']
-        all_tracks = lidarr.get_tracks(artistId = artist_id, albumId = album_id, albumReleaseId = release_id)
+        logger.info(f"Searching album: {query}")
+        success = search_and_download(grab_list, [query], all_tracks, all_tracks[0], artist_name, release)
 
-        #TODO: Right now if search_for_tracks is False. Multi disc albums will never be downloaded so we need to loop through media in releases even for albums
-        if len(release['media']) == 1:
-            album_title = lidarr.get_album(album_id)['title']
-            if is_blacklisted(album_title):
-                continue
-
-            if len(album_title) == 1:
-                query = artist_name + " " + album_title
-            else:
-                query = artist_name + " " + album_title if config.getboolean('Search Settings', 'album_prepend_artist', fallback=False) else album_title
+    if not success and config.getboolean('Search Settings', 'search_for_tracks', fallback=True):
+        for media in release['media']:
+            tracks = []
+            for track in all_tracks:
+                if track['mediumNumber'] == media['mediumNumber']:
+                    tracks.append(track)
 
-            logger.info(f"Searching album: {query}")
-            success = search_and_download(grab_list, query, all_tracks, all_tracks[0], artist_name, release)
+            queries = []
+            for track in tracks:
+                if is_blacklisted(track['title']):
+                    continue
 
-        if not success and config.getboolean('Search Settings', 'search_for_tracks', fallback=True):
-            for media in release['media']:
-                tracks = []
-                for track in all_tracks:
-                    if track['mediumNumber'] == media['mediumNumber']:
-                        tracks.append(track)
+                if len(track['title']) == 1:
+                    query = artist_name + " " + track['title']
+                else:
+                    query = artist_name + " " + track['title'] if config.getboolean('Search Settings', 'track_prepend_artist', fallback=True) else track['title']
 
-                for track in tracks:
-                    if is_blacklisted(track['title']):
-                        continue
+                if query not in queries:
+                    queries.append(query)
 
-                    if len(track['title']) == 1:
-                        query = artist_name + " " + track['title']
-                    else:
-                        query = artist_name + " " + track['title'] if config.getboolean('Search Settings', 'track_prepend_artist', fallback=True) else track['title']
+            #Track queries of a medium run as batches on slskd and share one candidate pool
+            for i in range(0, len(queries), track_search_batch_size):
+                batch = queries[i:i + track_search_batch_size]
+                logger.info(f"Searching tracks: {', '.join(batch)}")
+                success = search_and_download(grab_list, batch, tracks, tracks[0], artist_name, release)
 
-                    logger.info(f"Searching track: {query}")
-                    success = search_and_download(grab_list, query, tracks, track, artist_name, release)
+                if success:
+                    break
 
-                    if success:
-                        break
+    if enable_search_denylist:
+        update_search_denylist(album_id, success)
 
-        if enable_search_denylist:
-            update_search_denylist(search_denylist, album_id, success)
+    if not success:
+        if remove_wanted_on_failure:
+            logger.error(f"Failed to find match for: {album['title']} from artist: {artist_name}."
+                + ' Album removed from wanted list and added to the failures table')
 
-        if not success:
-            if remove_wanted_on_failure:
-                logger.error(f"Failed to find match for: {album['title']} from artist: {artist_name}."
-                    + ' Album removed from wanted list and added to "failure_list.txt"')
+            current_datetime = datetime.now()
+            current_datetime_str = current_datetime.strftime("%d/%m/%Y %H:%M:%S")
 
-                album['monitored'] = False
-                lidarr.upd_album(album)
+            with state_lock:
+                failed_albums.append((album, (current_datetime_str, artist_name, album['title'], album_id)))
+        else:
+            logger.error(f"Failed to find match for: {album['title']} from artist: {artist_name}")
 
-                current_datetime = datetime.now()
-                current_datetime_str = current_datetime.strftime("%d/%m/%Y %H:%M:%S")
+    return success
 
-                failure_string = current_datetime_str + " - " + artist_name + ", " + album['title'] + ", " + str(album_id) + "\n"
 
-                with open(failure_file_path, "a") as file:
-                    file.write(failure_string)
-            else:
-                logger.error(f"Failed to find match for: {album['title']} from artist: {artist_name}")
+def download_progress(directory):
+    return sum(file.get('bytesTransferred', 0) for file in directory["files"]), [file["state"] for file in directory["files"]]
 
-            failed_searches += 1
 
-        success = False
-
-    logger.info("Downloads added:")
-    downloads = slskd.transfers.get_all_downloads()
+def monitor_downloads(grab_list, on_complete=None, on_tick=None):
+    """
+    Waits for every folder in grab_list to finish downloading.
+    Finished folders are removed from grab_list and handed to on_complete right away, and
+    on_tick is called once per poll, so post-processing runs while other downloads continue.
+    Polls slskd once per tick with get_all_downloads() and looks folders up by (username, directory).
+    Folders with errored files are cancelled straight away. A folder that makes no progress for
+    stalled_timeout seconds is cancelled on its own without affecting the others.
+    The poll interval drops to poll_interval_min while transfers are moving and backs off
+    towards poll_interval_max while everything is queued remotely.
+    """
+    last_progress = {}
+    last_change = {}
+    interval = poll_interval_min
+    last_poll = time.monotonic()
 
-    for download in downloads:
-        username = download['username']
-        for dir in download['directories']:
-            logger.info(f"Username: {username} Directory: {dir['directory']}")
-    logger.info("-------------------")
-    logger.info(f"Waiting for downloads... monitor at: {''.join([slskd_host_url, slskd_url_base, 'downloads'])}")
+    while True:
+        try:
+            downloads = slskd.transfers.get_all_downloads()
+        except Exception:
+            logger.info(f"Error getting downloads from slskd\n{traceback.format_exc()}")
+            if time.monotonic() - last_poll > stalled_timeout:
+                logger.error("Stall timeout reached without a response from slskd! Giving up on waiting for downloads.")
+                break
+            time.sleep(interval)
+            continue
+        last_poll = time.monotonic()
 
-    time_count = 0
+        directories = {}
+        for download in downloads:
+            for directory in download["directories"]:
+                directories[(download["username"], directory["directory"])] = directory
 
-    while True:
+        now = time.monotonic()
         unfinished = 0
+        progressed = False
+
         for artist_folder in list(grab_list):
             username, dir = artist_folder['username'], artist_folder['directory']
-            
-            try:
-                downloads = slskd.transfers.get_downloads(username)
-            except Exception:
-                logger.info(f"Error getting directory from user: \"{username}\"\n{traceback.format_exc()}")
+            key = (username, dir["name"])
+            directory = directories.get(key)
+
+            if directory is None:
                 continue
 
-            for directory in downloads["directories"]:
-                if directory["directory"] == dir["name"]:
-                    # Generate list of errored or failed downloads
-                    errored_files = [file for file in directory["files"] if file["state"] in [
-                        'Completed, Cancelled',
-                        'Completed, TimedOut',
-                        'Completed, Errored',
-                        'Completed, Rejected',
-                    ]]
-                    # Generate list of downloads still pending
-                    pending_files = [file for file in directory["files"] if not 'Completed' in file["state"]]
-
-                    # If we have errored files, cancel and remove ALL files so we can retry next time
-                    if len(errored_files) > 0:
-                        logger.error(f"FAILED: Username: {username} Directory: {dir['name']}")
-                        cancel_and_delete(artist_folder['dir'], artist_folder['username'], directory["files"])
-                        grab_list.remove(artist_folder)
-                    elif len(pending_files) > 0:
-                        unfinished += 1
+            # Generate list of errored or failed downloads
+            errored_files = [file for file in directory["files"] if file["state"] in [
+                'Completed, Cancelled',
+                'Completed, TimedOut',
+                'Completed, Errored',
+                'Completed, Rejected',
+            ]]
+            # Generate list of downloads still pending
+            pending_files = [file for file in directory["files"] if not 'Completed' in file["state"]]
+
+            # If we have errored files, cancel and remove ALL files so we can retry next time
+            if len(errored_files) > 0:
+                logger.error(f"FAILED: Username: {username} Directory: {dir['name']}")
+                peer_reputation.record(username, "failures")
+                state_store.finish_grab(artist_folder['grab_id'], 'failed')
+                cancel_and_delete(artist_folder['dir'], artist_folder['username'], directory["files"])
+                grab_list.remove(artist_folder)
+                continue
+
+            if len(pending_files) == 0:
+                peer_reputation.record(username, "successes",
+                                       sum(file.get('size', 0) for file in directory["files"]),
+                                       time.time() - artist_folder['enqueued_at'])
+                state_store.finish_grab(artist_folder['grab_id'], 'completed')
+                grab_list.remove(artist_folder)
+                if on_complete is not None:
+                    on_complete(artist_folder)
+                continue
+
+            progress = download_progress(directory)
+            if last_progress.get(key) != progress:
+                if key in last_progress:
+                    progressed = True
+                last_progress[key] = progress
+                last_change[key] = now
+            elif now - last_change[key] > stalled_timeout:
+                #No bytes or file state changed for stalled_timeout seconds. This also covers folders stuck entirely as queued.
+                logger.error(f"Removing Stalled Download: Username: {username} Directory: {dir['name']}")
+                peer_reputation.record(username, "stalls")
+                state_store.finish_grab(artist_folder['grab_id'], 'stalled')
+                cancel_and_delete(artist_folder['dir'], artist_folder['username'], directory["files"])
+                grab_list.remove(artist_folder)
+                continue
+
+            unfinished += 1
+
+        if on_tick is not None:
+            on_tick()
 
         if unfinished == 0:
             logger.info("All tracks finished downloading!")
             time.sleep(5)
             break
 
-        time_count += 10
+        interval = poll_interval_min if progressed else min(interval * 2, poll_interval_max)
+        logger.debug(f"{unfinished} downloads unfinished. Next check in {interval}s")
+        time.sleep(interval)
 
-        if(time_count > stalled_timeout):
-            logger.info("Stall timeout reached! Removing stuck downloads...")
-            for artist_folder in list(grab_list):
-                username, dir = artist_folder['username'], artist_folder['directory']
 
-                for directory in downloads["directories"]:
-                    if directory["directory"] == dir["name"]:
-                        #TODO: This does not seem to account for directories where the whole dir is stuck as queued.
-                        #Either it needs to account for those or maybe soularr should just force clear out the downloads screen when it exits.
-                        pending_files = [file for file in directory["files"] if not 'Completed' in file["state"]]
+def tag_file(path, tags):
+    """
+    Writes tags to one file, skipping the save when they already match.
+    Runs on the tagging thread pool and reports errors instead of raising them.
+    Returns (changed, traceback text or None).
+    """
+    try:
+        song = music_tag.load_file(path)
+        if song is None:
+            return False, None
 
-                        if len(pending_files) > 0:
-                            logger.error(f"Removing Stalled Download: Username: {username} Directory: {dir['name']}")
-                            cancel_and_delete(artist_folder['dir'], artist_folder['username'], directory["files"])
-                            grab_list.remove(artist_folder)
+        changed = False
+        for key, value in tags.items():
+            if str(song[key]) != str(value):
+                song[key] = value
+                changed = True
 
-            logger.info("All tracks finished downloading!")
-            time.sleep(5)
-            break
+        if changed:
+            song.save()
+        return changed, None
+    except Exception:
+        return False, traceback.format_exc()
 
-        time.sleep(10)
 
-    os.chdir(slskd_download_dir)
-    commands = []
-    grab_list.sort(key=operator.itemgetter('artist_name'))
+@stage_timings.stage('tagging')
+def tag_folder(folder, tags):
+    """
+    Tags every allowed audio file in folder, on a thread pool of tag_workers when there is
+    more than one file. Returns how many files were changed.
+    """
+    paths = [os.path.join(folder, filename) for filename in os.listdir(folder) if filename.split(".")[-1] in allowed_extensions]
 
-    for artist_folder in grab_list:
-        artist_name = artist_folder['artist_name']
-        artist_name_sanitized = sanitize_folder_name(artist_name)
+    if tag_workers > 1 and len(paths) > 1:
+        #Threads, not processes: tagging is mostly file I/O, and forking while the search, browse and
+        #status threads are running can deadlock the child
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(tag_workers, len(paths)), thread_name_prefix='tag') as pool:
+            results = list(pool.map(tag_file, paths, [tags] * len(paths)))
+    else:
+        results = [tag_file(path, tags) for path in paths]
 
-        folder = artist_folder['dir']
+    for path, (_changed, error) in zip(paths, results):
+        if error is not None:
+            logger.error(f"Error tagging file: {path}\n{error}")
 
-        if artist_folder['release']['mediumCount'] > 1:
-            if os.path.exists(folder):
-                for filename in os.listdir(folder):
-                    album_name = lidarr.get_album(albumIds = artist_folder['release']['albumId'])['title']
+    return sum(changed for changed, _error in results)
 
-                    if filename.split(".")[-1] in allowed_filetypes:
-                        song = music_tag.load_file(os.path.join(folder,filename))
-                        if song is not None:
-                            song['artist'] = artist_name
-                            song['albumartist'] = artist_name
-                            song['album'] = album_name
-                            song['discnumber'] = artist_folder['discnumber']
-                            song.save()
 
-                    new_dir = os.path.join(artist_name_sanitized,sanitize_folder_name(album_name))
+def move_completed_folder(artist_folder):
+    """
+    Moves a finished download folder into its artist folder, retagging multi-disc releases.
+    Returns the sanitized artist folder name. Expects the cwd to be slskd_download_dir.
+    """
+    artist_name = artist_folder['artist_name']
+    artist_name_sanitized = sanitize_folder_name(artist_name)
 
-                    if not os.path.exists(artist_name_sanitized):
-                        os.mkdir(artist_name_sanitized)
-                    if not os.path.exists(new_dir):
-                        os.mkdir(new_dir)
+    folder = artist_folder['dir']
 
-                    if os.path.exists(os.path.join(folder,filename)) and not os.path.exists(os.path.join(new_dir,filename)):
-                        shutil.move(os.path.join(folder,filename),new_dir)
-            else: 
-                album_name = lidarr.get_album(albumIds = artist_folder['release']['albumId'])['title']
-                logger.error(f"Folder {folder} doesn't exist for {artist_name} : {album_name}")
+    if artist_folder['release']['mediumCount'] > 1:
+        album_name = lidarr.get_album(albumIds = artist_folder['release']['albumId'])['title']
 
-            if os.path.exists(folder):
-                shutil.rmtree(folder)
+        if os.path.exists(folder):
+            start = time.monotonic()
+            tags = {
+                'artist': artist_name,
+                'albumartist': artist_name,
+                'album': album_name,
+                'discnumber': artist_folder['discnumber'],
+            }
+            changed = tag_folder(folder, tags)
+            logger.info(f"Tagged {changed} files in {folder} in {time.monotonic() - start:.2f}s")
 
-        elif os.path.exists(folder):
-            shutil.move(folder,artist_name_sanitized)
+            new_dir = os.path.join(artist_name_sanitized,sanitize_folder_name(album_name))
+            os.makedirs(new_dir, exist_ok=True)
 
-    if lidarr_disable_sync:
-        return failed_searches
+            for filename in os.listdir(folder):
+                if not os.path.exists(os.path.join(new_dir,filename)):
+                    shutil.move(os.path.join(folder,filename),new_dir)
+        else: 
+            logger.error(f"Folder {folder} doesn't exist for {artist_name} : {album_name}")
 
-    artist_folders = next(os.walk('.'))[1]
-    artist_folders = [folder for folder in artist_folders if folder != 'failed_imports']
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
 
-    for artist_folder in artist_folders:
-        download_dir = os.path.join(lidarr_download_dir,artist_folder)
-        command = lidarr.post_command(name = 'DownloadedAlbumsScan', path = download_dir)
-        commands.append(command)
-        logger.info(f"Starting Lidarr import for: {artist_folder} ID: {command['id']}")
+    elif os.path.exists(folder):
+        shutil.move(folder,artist_name_sanitized)
+
+    return artist_name_sanitized
 
-    while True:
-        completed_count = 0
-        for task in commands:
-            current_task = lidarr.get_command(task['id'])
-            if current_task['status'] == 'completed' or current_task['status'] == 'failed':
-                completed_count += 1
-        if completed_count == len(commands):
-            break
-        time.sleep(2)
 
-    for task in commands:
+def start_lidarr_import(artist_folder, commands, imported):
+    download_dir = os.path.join(lidarr_download_dir,artist_folder)
+    command = lidarr.post_command(name = 'DownloadedAlbumsScan', path = download_dir)
+    commands.append(command)
+    imported.add(artist_folder)
+    logger.info(f"Starting Lidarr import for: {artist_folder} ID: {command['id']}")
+
+
+@stage_timings.stage('import_poll')
+def poll_lidarr_imports(commands):
+    """
+    Checks the outstanding DownloadedAlbumsScan commands, logs the ones that have finished and
+    moves failed imports aside. Finished commands are removed from the list.
+    Returns how many commands are still running.
+    """
+    for task in list(commands):
         current_task = lidarr.get_command(task['id'])
+        if current_task['status'] != 'completed' and current_task['status'] != 'failed':
+            continue
+
+        commands.remove(task)
         try:
             logger.info(f"{current_task['commandName']} {current_task['message']} from: {current_task['body']['path']}")
 
@@ -659,12 +1587,140 @@ def grab_most_wanted(albums):
             logger.error("Error printing lidarr task message. Printing full unparsed message.")
             logger.error(current_task)
 
+    return len(commands)
+
+
+def apply_failed_albums(failed_albums):
+    """
+    Unmonitors every album that failed this search phase with one bulk Lidarr call and records
+    them in the failures table in one transaction. Falls back to one upd_album per album if the
+    bulk endpoint is rejected.
+    """
+    if len(failed_albums) == 0:
+        return
+
+    album_ids = [album['id'] for album, _failure in failed_albums]
+    try:
+        lidarr.monitor_albums(album_ids, False)
+    except Exception:
+        logger.warning(f"Bulk unmonitor failed, unmonitoring albums one at a time\n{traceback.format_exc()}")
+        for album, _failure in failed_albums:
+            album['monitored'] = False
+            lidarr.upd_album(album)
+
+    state_store.record_failures([failure for _album, failure in failed_albums])
+    logger.info(f"Unmonitored {len(album_ids)} failed albums")
+
+
+def grab_most_wanted(albums, search_done=None):
+    grab_list = []
+    failed_albums = []
+
     if enable_search_denylist:
-        save_search_denylist(denylist_file_path, search_denylist)
+        eligible = []
+        for album in albums:
+            if is_search_denylisted(album['id']):
+                logger.info(f"Skipping denylisted album: {album['artist']['artistName']} - {album['title']} (ID: {album['id']})")
+            else:
+                eligible.append(album)
+
+        albums = prioritize_albums(eligible)
+
+        if search_budget > 0 and len(albums) > search_budget:
+            logger.info(f"Searching the top {search_budget} of {len(albums)} eligible albums this cycle")
+            albums = albums[:search_budget]
+
+    #Albums, artist folders and download folders this cycle is still downloading, so an overlapping
+    #daemon cycle leaves them alone. Registered before searching and filled in by register_in_flight
+    #as each folder is enqueued, since slskd writes finished tracks to disk straight away.
+    cycle_key = object()
+    with state_lock:
+        in_flight[cycle_key] = {'grab_list': grab_list, 'albums': set(), 'artists': set(), 'dirs': set()}
+
+    try:
+        try:
+            if concurrent_searches > 1:
+                logger.info(f"Searching {len(albums)} albums with {concurrent_searches} concurrent searches")
+                with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_searches, thread_name_prefix='album') as pool:
+                    results = list(pool.map(lambda album: grab_album(album, grab_list, failed_albums), albums))
+            else:
+                results = [grab_album(album, grab_list, failed_albums) for album in albums]
+        finally:
+            #Applied even if the search phase dies part way, like the per-album updates used to be
+            apply_failed_albums(failed_albums)
+
+        failed_searches = results.count(False)
+
+        logger.info("Downloads added:")
+        downloads = slskd.transfers.get_all_downloads()
+
+        for download in downloads:
+            username = download['username']
+            for dir in download['directories']:
+                logger.info(f"Username: {username} Directory: {dir['directory']}")
+        logger.info("-------------------")
+        logger.info(f"Waiting for downloads... monitor at: {''.join([slskd_host_url, slskd_url_base, 'downloads'])}")
+
+        if search_done is not None:
+            search_done.set()
+
+        process_downloads(grab_list, cycle_key)
+    finally:
+        with state_lock:
+            del in_flight[cycle_key]
 
     return failed_searches
 
 
+def process_downloads(grab_list, cycle_key):
+    """
+    Waits for the grabbed folders to download, moves them into artist folders and runs the
+    Lidarr imports as each artist completes.
+    """
+    os.chdir(slskd_download_dir)
+    commands = []
+    imported = set()
+
+    def folder_complete(artist_folder):
+        artist_name_sanitized = move_completed_folder(artist_folder)
+
+        if lidarr_disable_sync:
+            return
+        #Wait for every folder from this artist so Lidarr scans the artist folder once, with all of it there
+        if any(sanitize_folder_name(other['artist_name']) == artist_name_sanitized for other in grab_list):
+            return
+        if os.path.isdir(artist_name_sanitized):
+            start_lidarr_import(artist_name_sanitized, commands, imported)
+
+    with stage_timings.stage('download_wait'):
+        monitor_downloads(grab_list, on_complete=folder_complete, on_tick=lambda: poll_lidarr_imports(commands))
+
+    #Folders slskd no longer reports are handled the same way as before, once everything else is done
+    grab_list.sort(key=operator.itemgetter('artist_name'))
+    while grab_list:
+        folder_complete(grab_list.pop(0))
+
+    if lidarr_disable_sync:
+        return
+
+    #Also import anything left behind by earlier runs, but not artist or download folders another daemon cycle is still filling
+    busy_folders = set()
+    with state_lock:
+        for key, cycle in in_flight.items():
+            if key is not cycle_key:
+                busy_folders |= cycle['artists'] | cycle['dirs']
+
+    artist_folders = next(os.walk('.'))[1]
+    artist_folders = [folder for folder in artist_folders if folder != 'failed_imports' and folder not in imported and folder not in busy_folders]
+
+    for artist_folder in artist_folders:
+        start_lidarr_import(artist_folder, commands, imported)
+
+    with stage_timings.stage('import_wait'):
+        while poll_lidarr_imports(commands) > 0:
+            time.sleep(2)
+
+
 def move_failed_import(src_path):
     failed_imports_dir = "failed_imports"
 
@@ -692,6 +1748,38 @@ def slskd_version_check(version, target="0.22.2"):
     target_tuple = tuple(map(int, target.split('.')[:3]))
     return version_tuple > target_tuple
 
+def probe_slskd_capabilities():
+    start = time.monotonic()
+    version = slskd.application.version()
+    version_check = slskd_version_check(version)
+
+    if not version_check:
+        logger.info(f"Error checking slskd version number: {version}. Version check > 0.22.2: {version_check}. This would most likely be fixed by updating your slskd.")
+
+    capabilities = {
+        "version": version,
+        #slskd > 0.22.2 wraps the users/directory response in a list
+        "directory_returns_list": version_check,
+        "probed_at": time.monotonic(),
+    }
+    logger.info(f"Probed slskd {version} in {capabilities['probed_at'] - start:.2f}s. Capabilities: {capabilities}")
+    return capabilities
+
+
+def get_slskd_capabilities():
+    """
+    Returns the cached slskd capability flags, probing slskd on first use and again
+    once slskd_capability_ttl seconds have passed (0 probes once per run).
+    """
+    global slskd_capabilities
+
+    with capabilities_lock:
+        if (slskd_capabilities is None
+            or (slskd_capability_ttl > 0 and time.monotonic() - slskd_capabilities['probed_at'] > slskd_capability_ttl)):
+            slskd_capabilities = probe_slskd_capabilities()
+        return slskd_capabilities
+
+
 def setup_logging(config):
     if 'Logging' in config:
         log_config = config['Logging']
@@ -700,26 +1788,59 @@ def setup_logging(config):
     logging.basicConfig(**log_config)   # type: ignore
 
 
-def get_current_page(path: str, default_page=1) -> int:
-    if os.path.exists(path):
-        with open(path, 'r') as file:
-            page_string = file.read().strip()
+def get_current_page(default_page=1) -> int:
+    page_string = state_store.get_meta('current_page')
+
+    if page_string:
+        return int(page_string)
+
+    update_current_page(str(default_page))
+    return default_page
 
-            if page_string:
-                return int(page_string)
-            else:
-                with open(path, 'w') as file:
-                    file.write(str(default_page))
-                return default_page
-    else:
-        with open(path, 'w') as file:
-            file.write(str(default_page))
-        return default_page
 
+def update_current_page(page: str) -> None:
+    state_store.set_meta('current_page', page)
 
-def update_current_page(path: str, page: str) -> None:
-    with open(path, 'w') as file:
-            file.write(page)
+
+def fetch_remaining_pages(fetch_page, first_page, total_records, per_page):
+    """
+    Fetches pages 2..n of a paged Lidarr endpoint on a thread pool and returns the records
+    of every page in order. fetch_page(page) should return that page's records.
+    """
+    records = list(first_page['records'])
+    pages = math.ceil(total_records / per_page) if per_page else 1
+
+    if pages <= 1:
+        return records
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=lidarr_fetch_workers, thread_name_prefix='lidarr') as pool:
+        for page_records in pool.map(fetch_page, range(2, pages + 1)):
+            records.extend(page_records)
+
+    return records
+
+
+def load_wanted_snapshot(missing, first_page):
+    """
+    Returns the wanted records saved by the last run if they still look current, otherwise None.
+    Lidarr has no per-page change marker, so the snapshot is trusted only while totalRecords and
+    the album ids on page 1 are unchanged and it is younger than wanted_snapshot_max_age.
+    """
+    snapshot = state_store.get_wanted_snapshot('missing' if missing else 'cutoff_unmet')
+
+    if (snapshot is None
+        or time.time() - snapshot['fetched_at'] > wanted_snapshot_max_age
+        or snapshot['total_records'] != first_page['totalRecords']
+        or snapshot['first_page_ids'] != [record['id'] for record in first_page['records']]):
+        return None
+
+    logger.info(f"Wanted list unchanged since last run. Using {len(snapshot['records'])} records from snapshot.")
+    return snapshot['records']
+
+
+def save_wanted_snapshot(missing, first_page, records):
+    state_store.set_wanted_snapshot('missing' if missing else 'cutoff_unmet', first_page['totalRecords'],
+                                    [record['id'] for record in first_page['records']], records)
 
 
 def get_records(missing: bool) -> list:
@@ -730,26 +1851,38 @@ def get_records(missing: bool) -> list:
         return []
 
     total_wanted = wanted['totalRecords']
+    #Pages that failed to load, so a truncated list is never saved as the snapshot
+    failed_pages = []
+
+    def get_wanted_page(page):
+        try:
+            return lidarr.get_wanted(page=page, page_size=page_size, sort_dir='ascending',sort_key='albums.title', missing=missing)['records']
+        except ConnectionError as ex:
+            logger.error(f"Failed to grab record: {ex}")
+            failed_pages.append(page)
+            return []
 
     wanted_records = []
     if search_type == 'all':
-        page = 1
-        while len(wanted_records) < total_wanted:
-            try:
-                wanted = lidarr.get_wanted(page=page, page_size=page_size, sort_dir='ascending',sort_key='albums.title', missing=missing)
-            except ConnectionError as ex:
-                logger.error(f"Failed to grab record: {ex}")
-            wanted_records.extend(wanted['records'])
-            page += 1
+        if incremental_wanted:
+            wanted_records = load_wanted_snapshot(missing, wanted)
+
+        if not incremental_wanted or wanted_records is None:
+            wanted_records = fetch_remaining_pages(get_wanted_page, wanted, total_wanted, page_size)
+
+            if incremental_wanted and len(failed_pages) == 0:
+                save_wanted_snapshot(missing, wanted, wanted_records)
+            elif incremental_wanted:
+                logger.warning(f"Not saving the wanted list snapshot, {len(failed_pages)} page(s) failed to load")
 
     elif search_type == 'incrementing_page':
-        page = get_current_page(current_page_file_path)
+        page = get_current_page()
         try:
             wanted_records = lidarr.get_wanted(page=page, page_size=page_size, sort_dir='ascending',sort_key='albums.title', missing=missing)['records']
         except ConnectionError as ex:
             logger.error(f"Failed to grab record: {ex}")
         page = 1 if page >= math.ceil(total_wanted / page_size) else page + 1
-        update_current_page(current_page_file_path, str(page))
+        update_current_page(str(page))
 
     elif search_type == 'first_page':
         wanted_records = wanted['records']
@@ -763,34 +1896,28 @@ def get_records(missing: bool) -> list:
     try:
 
         queued_records = lidarr.get_queue(sort_dir='ascending',sort_key='albums.title')
-        total_queued = queued_records['totalRecords']
-        current_queue = queued_records['records']
 
-        if queued_records['pageSize'] < total_queued:
-            page = 2
-            while len(current_queue) < total_queued:
-                try:
-                    next_page = lidarr.get_queue(page=page,sort_key='albums.title',sort_dir='ascending')
-                except ConnectionError as ex:
-                    logger.error(f"Failed to get queue details: {ex}")
-                    break
-                current_queue.extend(next_page['records'])
-                page += 1
+        def get_queue_page(page):
+            try:
+                return lidarr.get_queue(page=page,sort_key='albums.title',sort_dir='ascending')['records']
+            except ConnectionError as ex:
+                logger.error(f"Failed to get queue details: {ex}")
+                return []
 
-        queued_album_ids = []
+        current_queue = fetch_remaining_pages(get_queue_page, queued_records, queued_records['totalRecords'], queued_records['pageSize'])
+
+        queued_album_ids = set()
         for record in current_queue:
             if 'albumId' in record:
-                queued_album_ids.append(record['albumId'])
+                queued_album_ids.add(record['albumId'])
             else:
                 logger.warning(f"Dropping entry due to missing key in keylist: [{record.keys()}]")
         
         wanted_records_not_queued = []
         for record in wanted_records:
-            for release in record['releases']:
-                if release['albumId'] in queued_album_ids:
-                    logging.info(f"Skipping record '{record['title']}' because it's already in download queue")
-                    break
-            else: #This only runs if the loop is broken out of. Saves on all the boolean found= stuff
+            if any(release['albumId'] in queued_album_ids for release in record['releases']):
+                logging.info(f"Skipping record '{record['title']}' because it's already in download queue")
+            else:
                 wanted_records_not_queued.append(record)
         if len(wanted_records_not_queued) > 0 :
             wanted_records = wanted_records_not_queued
@@ -803,53 +1930,187 @@ def get_records(missing: bool) -> list:
     return wanted_records
 
 
-def load_search_denylist(file_path):
-    if not os.path.exists(file_path):
-        return {}
+def search_backoff_delay(failures, jitter=True):
+    """
+    Seconds to wait before searching an album again after its nth consecutive failure.
+    Doubles from search_backoff_base up to search_backoff_max, with up to 20% random jitter
+    so albums that failed together do not all come back in the same cycle.
+    """
+    delay = min(search_backoff_base * 2 ** max(failures - 1, 0), search_backoff_max)
+    if jitter:
+        delay *= random.uniform(0.8, 1.2)
+    return delay
 
-    try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
-    except (json.JSONDecodeError, IOError) as ex:
-        logger.warning(f"Error loading search denylist: {ex}. Starting with empty denylist.")
-        return {}
 
+def is_search_denylisted(album_id):
+    entry = state_store.get_backoff(album_id)
+    if entry is not None:
+        return time.time() < entry['next_eligible']
+    return False
 
-def save_search_denylist(file_path, denylist):
-    try:
-        with open(file_path, 'w') as file:
-            json.dump(denylist, file, indent=2)
-    except IOError as ex:
-        logger.error(f"Error saving search denylist: {ex}")
 
+def prioritize_albums(albums):
+    """
+    Orders the wanted albums so the search budget goes to the likeliest successes:
+    never tried first, then the most recently released, then the fewest failures.
+    """
+    entries = {album['id']: state_store.get_backoff(album['id']) for album in albums}
 
-def is_search_denylisted(denylist, album_id, max_failures):
-    album_key = str(album_id)
-    if album_key in denylist:
-        return denylist[album_key]['failures'] >= max_failures
-    return False
+    #Stable sorts, least significant key first
+    albums = sorted(albums, key=lambda album: entries[album['id']]['failures'] if entries[album['id']] else 0)
+    albums.sort(key=lambda album: album.get('releaseDate') or '', reverse=True)
+    albums.sort(key=lambda album: entries[album['id']] is not None)
+    return albums
 
 
-def update_search_denylist(denylist, album_id, success):
-    album_key = str(album_id)
+def update_search_denylist(album_id, success):
     current_datetime = datetime.now()
     current_datetime_str = current_datetime.strftime("%Y-%m-%dT%H:%M:%S")
 
     if success:
-        if album_key in denylist:
-            logger.info("Removing album from denylist: %s", denylist[album_key]['album_id'])
-            del denylist[album_key]
+        if state_store.clear_backoff(album_id):
+            logger.info("Removing album from denylist: %s", album_id)
+    else:
+        entry = state_store.get_backoff(album_id)
+        failures = entry['failures'] + 1 if entry else 1
+        delay = search_backoff_delay(failures)
+        state_store.set_backoff(album_id, failures, current_datetime_str, time.time() + delay)
+        logger.info(f"Adding album to denylist: {album_id}. Next search in {delay / 3600:.1f}h")
+
+
+def register_in_flight(grab_list, folder_data):
+    """Marks a just-enqueued folder as busy for the cycle that owns grab_list."""
+    with state_lock:
+        for cycle in in_flight.values():
+            if cycle['grab_list'] is grab_list:
+                cycle['albums'].add(folder_data['release']['albumId'])
+                cycle['artists'].add(sanitize_folder_name(folder_data['artist_name']))
+                cycle['dirs'].add(folder_data['dir'])
+
+
+def albums_in_flight():
+    with state_lock:
+        return set().union(*(cycle['albums'] for cycle in in_flight.values()))
+
+
+def run_cycle(search_done=None):
+    """
+    One Soularr pass: fetch the wanted list, search and download, then import.
+    search_done is set once the searching is over and only downloads are left.
+    """
+    try:
+        wanted_records = []
+        for source in search_sources:
+            logging.debug(f'Getting records from {source}')
+            missing = source == 'missing'
+            wanted_records.extend(get_records(missing))
+
+        #Skip albums an earlier daemon cycle is still downloading
+        busy_albums = albums_in_flight()
+        wanted_records = [record for record in wanted_records if record['id'] not in busy_albums]
+
+        if len(wanted_records) == 0:
+            logger.info("No releases wanted. Exiting...")
+            return
+
+        failed = grab_most_wanted(wanted_records, search_done)
+    finally:
+        if search_done is not None:
+            search_done.set()
+
+    if failed == 0:
+        logger.info("Soularr finished. Exiting...")
     else:
-        logger.info("Adding album to denylist: " + album_key)
-        if album_key in denylist:
-            denylist[album_key]['failures'] += 1
-            denylist[album_key]['last_attempt'] = current_datetime_str
+        if remove_wanted_on_failure:
+            logger.info(f'{failed}: releases failed to find a match in the search results. See the failures table in "soularr.db" for the list of failed albums.')
         else:
-            denylist[album_key] = {
-                'failures': 1,
-                'last_attempt': current_datetime_str,
-                'album_id': album_id
-            }
+            logger.info(f"{failed}: releases failed to find a match in the search results and are still wanted.")
+
+    #Another daemon cycle may still be searching or watching its completed downloads
+    with state_lock:
+        other_cycles = len(in_flight)
+    if other_cycles == 0:
+        slskd.transfers.remove_completed_downloads()
+
+
+class StatusHandler(http.server.BaseHTTPRequestHandler):
+    """Serves daemon_status as JSON for the --daemon status endpoint."""
+
+    def do_GET(self):
+        with state_lock:
+            body = json.dumps(dict(daemon_status, albums_in_flight=sum(len(cycle['albums']) for cycle in in_flight.values()))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Status request: {format % args}")
+
+
+def write_stage_timings():
+    stage_timings.report()
+    if metrics_format != 'none':
+        try:
+            stage_timings.write(args.var_dir, metrics_format)
+        except OSError as ex:
+            logger.warning(f"Could not write stage timings to {args.var_dir}: {ex}")
+
+
+def daemon_cycle(search_done):
+    with state_lock:
+        daemon_status['cycles_running'] += 1
+        daemon_status['last_cycle_started'] = datetime.now().isoformat(timespec='seconds')
+        #Enqueue failures only ignore a peer for one cycle, like a single run. The peer reputation table keeps the long-term record.
+        ignored_users[:] = configured_ignored_users
+    result = 'error'
+    try:
+        lidarr.clear()
+        directory_cache.prune()
+        run_cycle(search_done)
+        result = 'ok'
+    except Exception:
+        logger.error(traceback.format_exc())
+        logger.error("Soularr cycle failed. Will retry next cycle.")
+    finally:
+        search_done.set()
+        with state_lock:
+            daemon_status['last_cycle_result'] = result
+            daemon_status['cycles_running'] -= 1
+            daemon_status['cycles_completed'] += 1
+            daemon_status['last_cycle_finished'] = datetime.now().isoformat(timespec='seconds')
+        write_stage_timings()
+
+
+def run_daemon():
+    """
+    Runs a cycle every daemon_interval seconds, keeping the clients and caches of this process.
+    The next cycle starts searching as soon as the previous one is only waiting on downloads,
+    but never while two cycles are already running.
+    """
+    logger.info(f"Starting Soularr daemon. Cycle interval: {daemon_interval}s")
+
+    if daemon_status_port > 0:
+        server = http.server.ThreadingHTTPServer(('', daemon_status_port), StatusHandler)
+        threading.Thread(target=server.serve_forever, name='status', daemon=True).start()
+        logger.info(f"Status endpoint listening on port {daemon_status_port}")
+
+    previous = None
+    while True:
+        next_cycle = time.monotonic() + daemon_interval
+        search_done = threading.Event()
+        cycle = threading.Thread(target=daemon_cycle, args=(search_done,), name='cycle', daemon=True)
+        cycle.start()
+
+        search_done.wait()
+        if previous is not None:
+            previous.join()
+        previous = cycle
+
+        with state_lock:
+            daemon_status['next_cycle'] = (datetime.now() + timedelta(seconds=max(0, next_cycle - time.monotonic()))).isoformat(timespec='seconds')
+        time.sleep(max(0, next_cycle - time.monotonic()))
 
 
 # Let's allow some overrides to be passed to the script
@@ -890,10 +2151,21 @@ parser.add_argument(
     help="Disable lock file creation",
 )
 
+parser.add_argument(
+    "--daemon",
+    action="store_true",
+    default=False,
+    help="Keep running and start a new cycle every [Daemon] interval seconds",
+)
+
 args = parser.parse_args()
+#process_downloads chdirs into the slskd download dir, so files written after that need an absolute var dir
+args.var_dir = os.path.abspath(args.var_dir)
 
 lock_file_path = os.path.join(args.var_dir, ".soularr.lock")
 config_file_path = os.path.join(args.config_dir, "config.ini")
+state_file_path = os.path.join(args.var_dir, "soularr.db")
+#Pre-SQLite state files, imported into state_file_path on first start
 failure_file_path = os.path.join(args.var_dir, "failure_list.txt")
 current_page_file_path = os.path.join(args.var_dir, ".current_page.txt")
 denylist_file_path = os.path.join(args.var_dir, "search_denylist.json")
@@ -929,6 +2201,8 @@ try:
 
     lidarr_download_dir = config['Lidarr']['download_dir']
     lidarr_disable_sync = config.getboolean('Lidarr', 'disable_sync', fallback=False)
+    lidarr_metadata_cache_ttl = config.getint('Lidarr', 'metadata_cache_ttl', fallback=0)
+    lidarr_fetch_workers = max(1, config.getint('Lidarr', 'fetch_workers', fallback=4))
 
     slskd_download_dir = config['Slskd']['download_dir']
 
@@ -936,14 +2210,21 @@ try:
     slskd_host_url = config['Slskd']['host_url']
 
     stalled_timeout = config.getint('Slskd', 'stalled_timeout', fallback=3600)
+    poll_interval_min = max(1, config.getint('Slskd', 'poll_interval_min', fallback=2))
+    poll_interval_max = max(poll_interval_min, config.getint('Slskd', 'poll_interval_max', fallback=30))
 
     delete_searches = config.getboolean('Slskd', 'delete_searches', fallback=True)
 
     slskd_url_base = config.get('Slskd', 'url_base', fallback='/')
+    slskd_capability_ttl = config.getint('Slskd', 'capability_ttl', fallback=0)
 
-    ignored_users = config.get('Search Settings', 'ignored_users', fallback='').split(",")
+    configured_ignored_users = config.get('Search Settings', 'ignored_users', fallback='').split(",")
+    #Peers that fail an enqueue are added for the rest of the run, see daemon_cycle
+    ignored_users = list(configured_ignored_users)
     search_type = config.get('Search Settings', 'search_type', fallback='first_page').lower().strip()
     search_source = config.get('Search Settings', 'search_source', fallback='missing').lower().strip()
+    incremental_wanted = config.getboolean('Search Settings', 'incremental_wanted', fallback=False)
+    wanted_snapshot_max_age = config.getint('Search Settings', 'wanted_snapshot_max_age', fallback=21600)
     
     download_filtering = config.get('Download Settings', 'download_filtering', fallback=False)
     use_extension_whitelist = config.get('Download Settings', 'use_extension_whitelist', fallback=False)
@@ -954,10 +2235,29 @@ try:
         search_sources = ['missing', 'cutoff_unmet']
 
     minimum_match_ratio = config.getfloat('Search Settings', 'minimum_filename_match_ratio', fallback=0.5)
+    match_backend = config.get('Search Settings', 'match_backend', fallback='indexed').lower().strip()
     page_size = config.getint('Search Settings', 'number_of_albums_to_grab', fallback=10)
+    browse_workers = max(1, config.getint('Search Settings', 'browse_workers', fallback=4))
+    browse_timeout = config.getint('Search Settings', 'browse_timeout', fallback=60)
+    rank_search_candidates = config.getboolean('Search Settings', 'rank_candidates', fallback=True)
+    max_browse_candidates = config.getint('Search Settings', 'max_browse_candidates', fallback=0)
+    stream_search_results = config.getboolean('Search Settings', 'stream_search_results', fallback=True)
+    track_search_batch_size = max(1, config.getint('Search Settings', 'track_search_batch_size', fallback=20))
+    min_peer_reliability = config.getfloat('Search Settings', 'min_peer_reliability', fallback=0.2)
+    peer_failure_half_life = config.getint('Search Settings', 'peer_failure_half_life', fallback=604800)
+    concurrent_searches = max(1, config.getint('Search Settings', 'concurrent_searches', fallback=1))
+    tag_workers = max(1, config.getint('Download Settings', 'tag_workers', fallback=4))
+    daemon_interval = config.getint('Daemon', 'interval', fallback=300)
+    daemon_status_port = config.getint('Daemon', 'status_port', fallback=0)
+    metrics_format = config.get('Metrics', 'format', fallback='none').lower().strip()
+    enable_directory_cache = config.getboolean('Search Settings', 'enable_directory_cache', fallback=True)
+    directory_cache_ttl = config.getint('Search Settings', 'directory_cache_ttl', fallback=86400)
+    directory_cache_size = config.getint('Search Settings', 'directory_cache_size', fallback=5000)
     remove_wanted_on_failure = config.getboolean('Search Settings', 'remove_wanted_on_failure', fallback=True)
     enable_search_denylist = config.getboolean('Search Settings', 'enable_search_denylist', fallback=False)
-    max_search_failures = config.getint('Search Settings', 'max_search_failures', fallback=3)
+    search_backoff_base = config.getint('Search Settings', 'search_backoff_base', fallback=21600)
+    search_backoff_max = config.getint('Search Settings', 'search_backoff_max', fallback=2592000)
+    search_budget = config.getint('Search Settings', 'search_budget', fallback=0)
 
     use_most_common_tracknum = config.getboolean('Release Settings', 'use_most_common_tracknum', fallback=True)
     allow_multi_disc = config.getboolean('Release Settings', 'allow_multi_disc', fallback=True)
@@ -975,24 +2275,36 @@ try:
     else:
         allowed_filetypes = [raw_filetypes]
 
+    allowed_extensions = [item.split(" ")[0] for item in allowed_filetypes]
+    filetype_predicates = [(allowed_filetype, compile_filetype_spec(allowed_filetype)) for allowed_filetype in allowed_filetypes]
+
     setup_logging(config)
 
     slskd = slskd_api.SlskdClient(host=slskd_host_url, api_key=slskd_api_key, url_base=slskd_url_base)
-    lidarr = LidarrAPI(lidarr_host_url, lidarr_api_key)
-    wanted_records = []
+    slskd_browse = slskd_api.SlskdClient(host=slskd_host_url, api_key=slskd_api_key, url_base=slskd_url_base, timeout=browse_timeout)
+    state_store = StateStore(state_file_path)
+    state_store.migrate_legacy_files(current_page_file_path, denylist_file_path, failure_file_path)
+
+    lidarr = CachedLidarr(LidarrAPI(lidarr_host_url, lidarr_api_key), state_file_path, lidarr_metadata_cache_ttl)
+    #Without the persistent cache, listings are still shared between the album and track searches of this run
+    directory_cache = DirectoryCache(state_file_path if enable_directory_cache else ":memory:",
+                                     directory_cache_ttl, directory_cache_size)
+    peer_reputation = PeerReputation(state_file_path, peer_failure_half_life)
+
     try:
-        for source in search_sources:
-            logging.debug(f'Getting records from {source}')
-            missing = source == 'missing'
-            wanted_records.extend(get_records(missing))
-    except ValueError as ex:
-        logger.error(f'An error occurred: {ex}')
-        logger.error('Exiting...')
-        sys.exit(0)
+        get_slskd_capabilities()
+    except Exception as ex:
+        logger.warning(f"Could not probe slskd capabilities, will retry on first directory browse: {ex}")
 
-    if len(wanted_records) > 0:
+    if args.daemon:
+        run_daemon()
+    else:
         try:
-            failed = grab_most_wanted(wanted_records)
+            run_cycle()
+        except ValueError as ex:
+            logger.error(f'An error occurred: {ex}')
+            logger.error('Exiting...')
+            sys.exit(0)
         except Exception:
             logger.error(traceback.format_exc())
             logger.error("\n Fatal error! Exiting...")
@@ -1000,19 +2312,20 @@ try:
             if os.path.exists(lock_file_path) and not is_docker():
                 os.remove(lock_file_path)
             sys.exit(0)
-        if failed == 0:
-            logger.info("Soularr finished. Exiting...")
-            slskd.transfers.remove_completed_downloads()
-        else:
-            if remove_wanted_on_failure:
-                logger.info(f'{failed}: releases failed to find a match in the search results. View "failure_list.txt" for list of failed albums.')
-            else:
-                logger.info(f"{failed}: releases failed to find a match in the search results and are still wanted.")
-            slskd.transfers.remove_completed_downloads()
-    else:
-        logger.info("No releases wanted. Exiting...")
 
 finally:
+    if not args.daemon:
+        write_stage_timings()
+    if directory_cache is not None:
+        directory_cache.close()
+    if peer_reputation is not None:
+        peer_reputation.close()
+    if lidarr is not None:
+        logger.info(f"Lidarr metadata cache: {lidarr.summary()}")
+        lidarr.close()
+    if state_store is not None:
+        state_store.close()
+
     # Remove the lock file after activity is done
     if os.path.exists(lock_file_path) and not is_docker():
         os.remove(lock_file_path)